@@ -14,6 +14,12 @@ from src.core.trading_engine import TradingEngine
 from src.core.config_manager import ConfigManager
 from src.utils.logger import setup_logging
 from src.agents.agent_orchestrator import AgentOrchestrator
+from src.ollama_agents.base_agent import BaseAgent
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 
 class VOLTTrading:
@@ -99,6 +105,9 @@ class VOLTTrading:
         if self.agent_orchestrator:
             await self.agent_orchestrator.stop()
 
+        # HTTP sessions shared by every Ollama agent in the process
+        await BaseAgent.aclose_shared()
+
         self.logger.info("VOLT Trading System shutdown complete")
 
 
@@ -127,6 +136,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    # libuv-backed event loop cuts task scheduling overhead when available
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -24,9 +24,17 @@ os.chdir(Path(__file__).parent)
 
 from src.core.config_manager import ConfigManager
 from src.core.trading_engine import TradingEngine
+from src.exchanges.binance_exchange import BinanceExchange
+from src.exchanges.dryrun_exchange import DryRunExchange, load_trade_log
 from src.agents.agent_orchestrator import AgentOrchestrator
+from src.ollama_agents.base_agent import BaseAgent
 from src.utils.logger import setup_logging
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 
 class DryRunTest:
     """Manages a timed dry-run trading test"""
@@ -49,6 +57,7 @@ class DryRunTest:
         self.config_manager.set("monitoring.log_level", "INFO")
 
         # Components
+        self.market_data = None
         self.trading_engine = None
         self.agent_orchestrator = None
 
@@ -69,7 +78,6 @@ class DryRunTest:
         # Clear previous test state for a fresh start
         for state_file in [
             Path("reports/dryrun_state.json"),
-            Path("reports/dryrun_trades.json"),
             Path("reports/engine_state.json"),
         ]:
             if state_file.exists():
@@ -88,8 +96,18 @@ class DryRunTest:
         self.logger.info(f"Timeframe: {self.config_manager.get('trading.timeframe')}")
         self.logger.info("=" * 60)
 
+        # Real market data outlives engine reconnects, keeping its session warm
+        self.market_data = BinanceExchange(
+            DryRunExchange.market_data_config(
+                self.config_manager.get_exchange_config()
+            )
+        )
+        await self.market_data.initialize()
+
         # Initialize trading engine
-        self.trading_engine = TradingEngine(self.config_manager)
+        self.trading_engine = TradingEngine(
+            self.config_manager, market_data=self.market_data
+        )
         await self.trading_engine.initialize()
 
         # Initialize agent orchestrator
@@ -184,6 +202,11 @@ class DryRunTest:
         if self.agent_orchestrator:
             await self.agent_orchestrator.stop()
 
+        if self.market_data:
+            await self.market_data.close()
+
+        await BaseAgent.aclose_shared()
+
         self.metadata["end_time"] = datetime.now().isoformat()
         self._save_metadata()
 
@@ -222,11 +245,15 @@ class DryRunTest:
         }
 
         # Load trade log if available
-        trade_log_file = Path("reports/dryrun_trades.json")
-        if trade_log_file.exists():
+        # Each DryRun exchange run writes its own log
+        trade_log_file = getattr(
+            self.trading_engine.exchange if self.trading_engine else None,
+            "trade_log_path",
+            None,
+        )
+        if trade_log_file is not None:
             try:
-                with open(trade_log_file) as f:
-                    trades = json.load(f)
+                trades = load_trade_log(trade_log_file)
                 report["trading_performance"]["total_trades"] = len(trades)
 
                 if trades:
@@ -353,6 +380,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    # libuv-backed event loop cuts task scheduling overhead when available
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
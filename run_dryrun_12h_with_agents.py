@@ -15,6 +15,9 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from src.core.config_manager import ConfigManager
 from src.core.trading_engine import TradingEngine
+from src.exchanges.binance_exchange import BinanceExchange
+from src.exchanges.dryrun_exchange import DryRunExchange
+from src.ollama_agents.base_agent import BaseAgent
 
 
 async def run_test(hours: int, capital: float):
@@ -45,8 +48,12 @@ async def run_test(hours: int, capital: float):
     
     print("\n🔧 Initializing trading engine...")
     
-    # Initialize engine
-    engine = TradingEngine(config_manager)
+    # Initialize engine; real market data is shared across its reconnects
+    market_data = BinanceExchange(
+        DryRunExchange.market_data_config(config_manager.get_exchange_config())
+    )
+    await market_data.initialize()
+    engine = TradingEngine(config_manager, market_data=market_data)
     await engine.initialize()
     
     print("✅ Engine initialized")
@@ -84,6 +91,8 @@ async def run_test(hours: int, capital: float):
     # Stop engine
     print("\n🛑 Stopping engine...")
     await engine.stop()
+    await market_data.close()
+    await BaseAgent.aclose_shared()
     
     # Generate report
     print("\n📊 Generating report...")
@@ -91,7 +100,7 @@ async def run_test(hours: int, capital: float):
     
     print("\n✅ Test complete!")
     print(f"📁 Report: reports/dryrun_12h_report.json")
-    print(f"📈 Trades: reports/dryrun_trades.json")
+    print(f"📈 Trades: {getattr(engine.exchange, 'trade_log_path', None)}")
     print(f"📝 Logs: logs/volt_trading.log")
 
 
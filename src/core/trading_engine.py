@@ -4,56 +4,139 @@ Core trading logic and execution engine
 """
 
 import asyncio
-import json
 import logging
+import os
+import random
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 from src.core.config_manager import ConfigManager
 from src.utils.logger import get_logger
-from src.exchanges.exchange_factory import ExchangeFactory
+from src.exchanges.exchange_factory import BaseExchange, ExchangeFactory
 from src.strategies.volt_strategy import VOLTStrategy
 from src.risk.risk_manager import RiskManager
+from src.utils import fast_json
+
+
+_OHLCV_COLS = ("timestamp", "open", "high", "low", "close", "volume")
+_PRICE_KEYS = ("last", "bid")
+
+
+@lru_cache(maxsize=8)
+def _sleep_interval_for(timeframe: str) -> int:
+    """Convert a timeframe string (e.g. '5m', '1h') to seconds"""
+    if timeframe.endswith("m"):
+        return int(timeframe[:-1]) * 60
+    elif timeframe.endswith("h"):
+        return int(timeframe[:-1]) * 3600
+    else:
+        return 300  # Default 5 minutes
+
+
+def _monotonic_to_iso(mono: Optional[float]) -> Optional[str]:
+    """Convert a time.monotonic() stamp to a wall-clock ISO string"""
+    if mono is None:
+        return None
+    return datetime.fromtimestamp(time.time() - (time.monotonic() - mono)).isoformat()
+
+
+def _write_json(data: Dict[str, Any], path: Path):
+    """Atomically write data as JSON - temp file + rename avoids torn files"""
+    path.parent.mkdir(exist_ok=True)
+    tmp_file = path.with_suffix(".tmp")
+    tmp_file.write_bytes(fast_json.dumpb(data, indent=True))
+    os.replace(tmp_file, path)
 
 
 class TradingEngine:
     """Core trading engine for VOLT Trading"""
 
-    def __init__(self, config_manager: ConfigManager):
+    __slots__ = (
+        "config_manager",
+        "logger",
+        "config",
+        "exchange",
+        "strategy",
+        "risk_manager",
+        "running",
+        "positions",
+        "last_update_mono",
+        "_active_positions",
+        "_consecutive_errors",
+        "_max_consecutive_errors",
+        "_loop_count",
+        "_last_heartbeat",
+        "_state_file",
+        "_trading_task",
+        "_timeframe",
+        "_initial_capital",
+        "_pairs",
+        "_sleep_interval",
+        "_klines",
+        "_market_cache",
+        "_latest_prices",
+        "_stream_candles",
+        "_stream_updated",
+        "_stream_tasks",
+        "_market_data",
+    )
+
+    def __init__(
+        self,
+        config_manager: ConfigManager,
+        market_data: Optional[BaseExchange] = None,
+    ):
         self.config_manager = config_manager
         self.logger = get_logger(__name__)
         self.config = config_manager.get_trading_config()
 
         # Components
         self.exchange = None
+        # Initialized real exchange a binance_dryrun exchange reads prices
+        # from; owned by the caller, so reconnects keep its warm session
+        self._market_data = market_data
         self.strategy = None
         self.risk_manager = None
 
         # State
         self.running = False
         self.positions = {}
-        self.last_update = None
+        self._active_positions = 0  # Positions with non-zero quantity
+        self.last_update_mono: Optional[float] = None
 
         # Stability tracking
         self._consecutive_errors = 0
         self._max_consecutive_errors = 10
         self._loop_count = 0
-        self._last_heartbeat = None
+        self._last_heartbeat: Optional[float] = None
         self._state_file = Path("reports/engine_state.json")
 
+        # Values derived from config are fixed for a run - bind them once
+        self._apply_config()
+
+        # Per-symbol OHLCV cache, extended incrementally each loop
+        self._klines: Dict[str, pd.DataFrame] = {}
+        # Market data handed to the strategy, reused across loops (read-only
+        # for consumers); holds only symbols refreshed in the latest fetch
+        self._market_cache: Dict[str, pd.DataFrame] = {}
+        # Latest close per symbol from the last market data fetch
+        self._latest_prices: Dict[str, float] = {}
+        # Live kline stream buffers (only used if the exchange can stream)
+        self._stream_candles: Dict[str, list] = {}
+        self._stream_updated: Dict[str, float] = {}
+        self._stream_tasks: List[asyncio.Task] = []
+
     async def initialize(self):
         """Initialize trading engine components"""
         self.logger.info("Initializing Trading Engine...")
 
         # Initialize exchange connection
-        exchange_config = self.config_manager.get_exchange_config()
-        # Pass initial_capital to exchange config for DryRun
-        exchange_config["initial_capital"] = self.config.get("initial_capital", 10000)
-        self.exchange = ExchangeFactory.create_exchange(
-            exchange_config["name"], exchange_config
-        )
+        self.exchange = self._create_exchange()
         await self.exchange.initialize()
 
         # Initialize trading strategy
@@ -82,6 +165,16 @@ class TradingEngine:
         self._trading_task = asyncio.create_task(self._trading_loop())
         self.logger.info("✅ Trading loop started as background task")
 
+        # Subscribe to live klines so the loop can skip OHLCV polling
+        if self.config.get("stream_market_data", True) and getattr(
+            self.exchange, "supports_ohlcv_stream", False
+        ):
+            self._stream_tasks = [
+                asyncio.create_task(self._stream_klines(symbol))
+                for symbol in self._pairs
+            ]
+            self.logger.info("Streaming klines for %d pairs", len(self._stream_tasks))
+
     async def stop(self):
         """Stop the trading engine"""
         self.running = False
@@ -95,8 +188,21 @@ class TradingEngine:
             except asyncio.CancelledError:
                 pass
 
+        # Cancel kline streams
+        for task in self._stream_tasks:
+            task.cancel()
+        if self._stream_tasks:
+            await asyncio.gather(*self._stream_tasks, return_exceptions=True)
+        self._stream_tasks = []
+
         # Save state before stopping
-        self._save_state()
+        await self._save_state()
+
+        if self.strategy is not None:
+            try:
+                await self.strategy.close()
+            except Exception as e:
+                self.logger.error(f"Error closing strategy: {e}")
 
         # Always close exchange connection
         if self.exchange and hasattr(self.exchange, "close"):
@@ -113,10 +219,10 @@ class TradingEngine:
 
         while self.running:
             try:
-                self._last_heartbeat = datetime.now()
+                self._last_heartbeat = time.monotonic()
                 self._loop_count += 1
 
-                self.logger.info(f"🔄 Trading loop #{self._loop_count} started")
+                self.logger.info("🔄 Trading loop #%d started", self._loop_count)
 
                 # Get market data
                 market_data = await self._get_market_data()
@@ -127,49 +233,38 @@ class TradingEngine:
                         market_data, self.positions
                     )
 
-                    self.logger.info(f"📊 Generated {len(signals)} signals")
-
-                    # Risk assessment
-                    for signal in signals:
-                        risk_assessment = await self.risk_manager.assess_risk(
-                            signal, self.positions
-                        )
+                    self.logger.info("📊 Generated %d signals", len(signals))
 
-                        if risk_assessment["approved"]:
-                            await self._execute_signal(signal, risk_assessment)
-                        else:
-                            self.logger.info(
-                                f"Signal rejected: {signal['symbol']} {signal['action']} "
-                                f"- {risk_assessment['reason']}"
-                            )
+                    await self._process_signals(signals)
 
                 # Update positions and monitor
                 await self._update_positions()
                 await self._monitor_performance()
 
-                # Phase 0: Update VIX data every 10 loops (~50 minutes)
-                if self._loop_count % 10 == 0:
+                # Periodic tasks - 60 is the LCM of the 10- and 12-loop periods
+                phase = self._loop_count % 60
+
+                # Every 10 loops (~50 minutes): Phase 0 VIX update + state save
+                if phase % 10 == 0:
                     self.logger.info("📊 Updating VIX data...")
                     await self.strategy.update_vix_data()
+                    await self._save_state()
 
                 # Reset error counter on success
                 self._consecutive_errors = 0
 
-                # Periodic state save (every 10 loops)
-                if self._loop_count % 10 == 0:
-                    self._save_state()
-
                 # Log heartbeat every 12 loops (~1h on 5m timeframe)
-                if self._loop_count % 12 == 0:
+                if phase % 12 == 0:
                     self.logger.info(
-                        f"💓 Heartbeat: loop #{self._loop_count}, "
-                        f"positions: {len(self.positions)}, "
-                        f"errors: {self._consecutive_errors}"
+                        "💓 Heartbeat: loop #%d, positions: %d, errors: %d",
+                        self._loop_count,
+                        len(self.positions),
+                        self._consecutive_errors,
                     )
 
                 # Sleep before next iteration
                 sleep_time = self._get_sleep_interval()
-                self.logger.debug(f"😴 Sleeping {sleep_time}s until next loop...")
+                self.logger.debug("😴 Sleeping %ds until next loop...", sleep_time)
                 await asyncio.sleep(sleep_time)
 
             except asyncio.CancelledError:
@@ -187,13 +282,51 @@ class TradingEngine:
                     await self._attempt_reconnection()
                     self._consecutive_errors = 0
 
-                # Exponential backoff: 5s, 10s, 20s, 40s... max 300s
-                backoff = min(5 * (2 ** (self._consecutive_errors - 1)), 300)
-                await asyncio.sleep(backoff)
+                # Exponential backoff: 5s, 10s, 20s, 40s... max 300s (jittered)
+                await asyncio.sleep(self._backoff_delay(self._consecutive_errors))
+
+    async def _process_signals(self, signals: List[Dict[str, Any]]):
+        """Assess and execute signals one at a time.
+
+        Each assessment must see the positions left by the previous fill,
+        so risk limits can't be bypassed by several signals passing against
+        the same stale snapshot.
+        """
+        for signal in signals:
+            risk_assessment = await self.risk_manager.assess_risk(
+                signal, self.positions
+            )
+
+            if risk_assessment["approved"]:
+                await self._execute_signal(signal, risk_assessment)
+            else:
+                self.logger.info(
+                    "Signal rejected: %s %s - %s",
+                    signal["symbol"],
+                    signal["action"],
+                    risk_assessment["reason"],
+                )
+
+    def _create_exchange(self) -> BaseExchange:
+        """Build the configured exchange adapter (not yet initialized)"""
+        exchange_config = self.config_manager.get_exchange_config()
+        # Pass initial_capital to exchange config for DryRun
+        exchange_config["initial_capital"] = self._initial_capital
+        kwargs = {}
+        if (
+            self._market_data is not None
+            and exchange_config["name"].lower() == "binance_dryrun"
+        ):
+            kwargs["shared_exchange"] = self._market_data
+        return ExchangeFactory.create_exchange(
+            exchange_config["name"], exchange_config, **kwargs
+        )
 
     async def _attempt_reconnection(self):
         """Attempt to reconnect to exchange after persistent errors"""
         self.logger.info("Attempting exchange reconnection...")
+        # Scatter reconnects so engines sharing an outage don't retry in lockstep
+        await asyncio.sleep(self._backoff_delay(1))
         try:
             if self.exchange and hasattr(self.exchange, "close"):
                 try:
@@ -201,36 +334,72 @@ class TradingEngine:
                 except Exception:
                     pass
 
-            exchange_config = self.config_manager.get_exchange_config()
-            exchange_config["initial_capital"] = self.config.get(
-                "initial_capital", 10000
-            )
-            self.exchange = ExchangeFactory.create_exchange(
-                exchange_config["name"], exchange_config
-            )
+            self.exchange = self._create_exchange()
             await self.exchange.initialize()
             self.logger.info("Exchange reconnection successful")
         except Exception as e:
             self.logger.error(f"Exchange reconnection failed: {e}")
 
     async def _get_market_data(self) -> Optional[pd.DataFrame]:
-        """Get current market data"""
+        """Get current market data
+
+        The first call per symbol fetches a full 100-candle window; later
+        calls merge only the latest candles into the cached frame in
+        ``self._klines``. Symbols with a live kline stream are read from the
+        stream buffer without any REST round-trip.
+        """
         try:
-            symbols = self.config.get("pairs", [])
-            timeframe = self.config.get("timeframe", "5m")
+            symbols = self._pairs
+            timeframe = self._timeframe
+
+            # Stream data counts as fresh if it arrived within one loop interval
+            now = time.monotonic()
+            streamed = {
+                symbol: self._stream_candles[symbol]
+                for symbol in symbols
+                if symbol in self._klines
+                and symbol in self._stream_candles
+                and now - self._stream_updated[symbol] < self._sleep_interval
+            }
+            to_fetch = [symbol for symbol in symbols if symbol not in streamed]
 
-            # Get OHLCV data for all symbols
-            all_data = {}
-            for symbol in symbols:
-                data = await self.exchange.get_ohlcv(symbol, timeframe, limit=100)
-                if data:
-                    all_data[symbol] = pd.DataFrame(
-                        data,
-                        columns=["timestamp", "open", "high", "low", "close", "volume"],
+            # Get OHLCV data for the remaining symbols concurrently
+            results = await asyncio.gather(
+                *(
+                    self.exchange.get_ohlcv(
+                        symbol, timeframe, limit=2 if symbol in self._klines else 100
                     )
-                    all_data[symbol]["timestamp"] = pd.to_datetime(
-                        all_data[symbol]["timestamp"], unit="ms"
+                    for symbol in to_fetch
+                ),
+                return_exceptions=True,
+            )
+
+            updated = set()
+            for symbol, data in [*streamed.items(), *zip(to_fetch, results)]:
+                if isinstance(data, Exception):
+                    self.logger.error("Error fetching OHLCV for %s: %s", symbol, data)
+                    continue
+                if not data:
+                    continue
+
+                if not self._merge_klines(symbol, self._ohlcv_to_frame(data)):
+                    # Missed candles since last loop - refill the full window
+                    data = await self.exchange.get_ohlcv(symbol, timeframe, limit=100)
+                    if not data:
+                        continue
+                    self._klines[symbol] = self._ohlcv_to_frame(data)
+                updated.add(symbol)
+
+            # Refresh the shared output mapping in place
+            all_data = self._market_cache
+            for symbol in symbols:
+                if symbol in updated:
+                    all_data[symbol] = self._klines[symbol].copy(deep=False)
+                    self._latest_prices[symbol] = float(
+                        self._klines[symbol]["close"].iloc[-1]
                     )
+                else:
+                    all_data.pop(symbol, None)
 
             return all_data if all_data else None
 
@@ -238,6 +407,55 @@ class TradingEngine:
             self.logger.error(f"Error getting market data: {e}")
             return None
 
+    def _merge_klines(self, symbol: str, new: pd.DataFrame) -> bool:
+        """Merge new candles into the symbol's cached frame
+
+        Returns False (leaving the cache untouched) when the new candles
+        don't overlap the cache, i.e. candles in between were missed.
+        """
+        cached = self._klines.get(symbol)
+        if cached is None:
+            self._klines[symbol] = new
+            return True
+        if new["timestamp"].iloc[0] > cached["timestamp"].iloc[-1]:
+            return False
+
+        self._klines[symbol] = (
+            pd.concat([cached, new], ignore_index=True)
+            .drop_duplicates("timestamp", keep="last")
+            .tail(100)
+            .reset_index(drop=True)
+        )
+        return True
+
+    async def _stream_klines(self, symbol: str):
+        """Buffer live kline updates for a symbol until the engine stops"""
+        timeframe = self._timeframe
+        errors = 0
+
+        while self.running:
+            try:
+                data = await self.exchange.watch_ohlcv(symbol, timeframe)
+                if data:
+                    self._stream_candles[symbol] = data[-100:]
+                    self._stream_updated[symbol] = time.monotonic()
+                errors = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                errors += 1
+                self.logger.warning("Kline stream error for %s: %s", symbol, e)
+                await asyncio.sleep(self._backoff_delay(errors))
+
+    @staticmethod
+    def _ohlcv_to_frame(data: list) -> pd.DataFrame:
+        """Build an OHLCV DataFrame from raw exchange candles"""
+        # Typed columns skip pandas' per-cell inference on list-of-lists input
+        arr = np.asarray(data, dtype=np.float64)
+        columns = dict(zip(_OHLCV_COLS, arr.T))
+        columns["timestamp"] = arr[:, 0].astype(np.int64).view("datetime64[ms]")
+        return pd.DataFrame(columns)
+
     async def _execute_signal(
         self, signal: Dict[str, Any], risk_assessment: Dict[str, Any]
     ):
@@ -249,15 +467,11 @@ class TradingEngine:
             # position_size from risk manager is a fraction of capital (e.g. 0.05 = 5%)
             position_size_fraction = risk_assessment["position_size"]
 
-            # Get current price
-            price = signal.get("entry_price", 0)
+            # Get current price - prefer the strategy's price, then the close
+            # fetched this loop, and only then a fresh ticker round-trip
+            price = signal.get("entry_price", 0) or self._latest_prices.get(symbol, 0)
             if not price or price <= 0:
-                ticker = await self.exchange.get_ticker(symbol)
-                # Handle both dict and float returns
-                if isinstance(ticker, dict):
-                    price = ticker.get("last", 0) or ticker.get("bid", 0) or 0
-                else:
-                    price = ticker or 0
+                price = self._extract_price(await self.exchange.get_ticker(symbol))
 
             if not price or price <= 0:
                 self.logger.error(f"Cannot get price for {symbol}")
@@ -271,7 +485,7 @@ class TradingEngine:
             except Exception:
                 available_capital = 0
             if available_capital <= 0:
-                available_capital = self.config.get("initial_capital", 10000)
+                available_capital = self._initial_capital
 
             if action == "sell":
                 # For sell: get existing position and sell a fraction of it
@@ -322,7 +536,8 @@ class TradingEngine:
         try:
             current_positions = await self.exchange.get_positions()
             self.positions = current_positions
-            self.last_update = datetime.now()
+            self._active_positions = self._count_active_positions()
+            self.last_update_mono = time.monotonic()
         except Exception as e:
             self.logger.error(f"Error updating positions: {e}")
 
@@ -339,12 +554,17 @@ class TradingEngine:
                 "side": "long",
             }
 
+        was_active = self.positions[symbol]["quantity"] != 0
         order_qty = float(order.get("filled", 0))
         if order.get("side") == "buy":
             self.positions[symbol]["quantity"] += order_qty
         else:
             self.positions[symbol]["quantity"] -= order_qty
 
+        is_active = self.positions[symbol]["quantity"] != 0
+        if is_active != was_active:
+            self._active_positions += 1 if is_active else -1
+
     async def _monitor_performance(self):
         """Monitor trading performance"""
         try:
@@ -356,55 +576,79 @@ class TradingEngine:
             cash = balance.get("total_usd", 0) if isinstance(balance, dict) else 0
             total_value = cash  # Start with cash
 
-            for symbol, position in self.positions.items():
-                if position["quantity"] != 0:
-                    ticker = await self.exchange.get_ticker(symbol)
-                    # Handle both dict and float returns
-                    if isinstance(ticker, dict):
-                        current_price = (
-                            ticker.get("last", 0) or ticker.get("bid", 0) or 0
-                        )
-                    else:
-                        current_price = ticker or 0
-
-                    if current_price:
-                        market_value = position["quantity"] * current_price
-                        total_value += market_value
-
-                        if position["quantity"] > 0:
-                            pnl = (current_price - position["entry_price"]) * position[
-                                "quantity"
-                            ]
-                            total_pnl += pnl
-                            position["unrealized_pnl"] = pnl
-
-            if self.last_update:
-                active = len([p for p in self.positions.values() if p["quantity"] != 0])
+            # Fetch prices for all open positions in one batch
+            active_symbols = [
+                symbol
+                for symbol, position in self.positions.items()
+                if position["quantity"] != 0
+            ]
+            if active_symbols:
+                tickers = await self.exchange.get_tickers(active_symbols)
+
+                # Vectorized P&L over the open positions
+                n = len(active_symbols)
+                qty = np.fromiter(
+                    (self.positions[s]["quantity"] for s in active_symbols),
+                    dtype=np.float64,
+                    count=n,
+                )
+                entry = np.fromiter(
+                    (self.positions[s]["entry_price"] for s in active_symbols),
+                    dtype=np.float64,
+                    count=n,
+                )
+                prices = np.fromiter(
+                    (self._extract_price(tickers.get(s)) for s in active_symbols),
+                    dtype=np.float64,
+                    count=n,
+                )
+
+                priced = prices != 0
+                total_value += float((qty * prices)[priced].sum())
+
+                longs = priced & (qty > 0)
+                pnl = (prices - entry) * qty
+                total_pnl = float(pnl[longs].sum())
+                for i in np.flatnonzero(longs):
+                    self.positions[active_symbols[i]]["unrealized_pnl"] = float(pnl[i])
+
+            if self.last_update_mono is not None:
                 self.logger.info(
-                    f"Portfolio: ${total_value:.2f} | P&L: ${total_pnl:.2f} | "
-                    f"Positions: {active}"
+                    "Portfolio: $%.2f | P&L: $%.2f | Positions: %d",
+                    total_value,
+                    total_pnl,
+                    self._active_positions,
                 )
 
         except Exception as e:
             self.logger.error(f"Error monitoring performance: {e}")
 
-    def _save_state(self):
-        """Persist engine state for crash recovery"""
+    @staticmethod
+    def _extract_price(ticker) -> float:
+        """Get a price from a ticker, handling both dict and float returns"""
+        if isinstance(ticker, dict):
+            return next((ticker[k] for k in _PRICE_KEYS if ticker.get(k)), 0)
+        return ticker or 0
+
+    async def _save_state(self):
+        """Persist engine state for crash recovery
+
+        The state is snapshotted on the event loop thread so concurrent
+        position updates can't change it mid-dump, then written from a
+        worker thread.
+        """
         try:
-            Path("reports").mkdir(exist_ok=True)
             state = {
-                "positions": self.positions,
+                "positions": {
+                    symbol: dict(position)
+                    for symbol, position in self.positions.items()
+                },
                 "loop_count": self._loop_count,
-                "last_heartbeat": self._last_heartbeat.isoformat()
-                if self._last_heartbeat
-                else None,
-                "last_update": self.last_update.isoformat()
-                if self.last_update
-                else None,
+                "last_heartbeat": _monotonic_to_iso(self._last_heartbeat),
+                "last_update": _monotonic_to_iso(self.last_update_mono),
                 "saved_at": datetime.now().isoformat(),
             }
-            with open(self._state_file, "w") as f:
-                json.dump(state, f, indent=2)
+            await asyncio.to_thread(_write_json, state, self._state_file)
         except Exception as e:
             self.logger.error(f"Failed to save engine state: {e}")
 
@@ -412,21 +656,36 @@ class TradingEngine:
         """Load persisted engine state"""
         try:
             if self._state_file.exists():
-                with open(self._state_file, "r") as f:
-                    state = json.load(f)
+                state = fast_json.loads(self._state_file.read_bytes())
                 self.positions = state.get("positions", {})
+                self._active_positions = self._count_active_positions()
                 self._loop_count = state.get("loop_count", 0)
                 self.logger.info(f"Loaded engine state from {state.get('saved_at')}")
         except Exception as e:
             self.logger.warning(f"Could not load engine state: {e}")
 
+    def _count_active_positions(self) -> int:
+        """Count positions with non-zero quantity"""
+        return sum(1 for p in self.positions.values() if p["quantity"] != 0)
+
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """Exponential backoff capped at 300s with 0.5x-1.5x random jitter"""
+        base = min(5 * (1 << max(attempt - 1, 0)), 300)
+        return base * (0.5 + random.random())
+
+    def reload_config(self):
+        """Re-read trading config and refresh values derived from it"""
+        self.config = self.config_manager.get_trading_config()
+        self._apply_config()
+
+    def _apply_config(self):
+        """Bind frequently used config values to attributes"""
+        self._timeframe = self.config.get("timeframe", "5m")
+        self._initial_capital = float(self.config.get("initial_capital", 10000))
+        self._pairs = tuple(self.config.get("pairs", []))
+        self._sleep_interval = _sleep_interval_for(self._timeframe)
+
     def _get_sleep_interval(self) -> int:
         """Get sleep interval between trading loop iterations"""
-        timeframe = self.config.get("timeframe", "5m")
-
-        if timeframe.endswith("m"):
-            return int(timeframe[:-1]) * 60
-        elif timeframe.endswith("h"):
-            return int(timeframe[:-1]) * 3600
-        else:
-            return 300  # Default 5 minutes
+        return self._sleep_interval
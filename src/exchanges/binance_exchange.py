@@ -3,12 +3,27 @@ VOLT Trading - Real Binance Exchange Connector
 Uses ccxt async library for live Binance spot trading
 """
 
+import ssl
+import time
+
+import aiohttp
+import certifi
 import ccxt.async_support as ccxt_async
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from src.exchanges.exchange_factory import BaseExchange
 from src.utils.logger import get_logger
 
+try:
+    import ccxt.pro as ccxt_pro
+except ImportError:
+    ccxt_pro = None
+
+
+def _fnum(value) -> float:
+    """Convert a ccxt numeric field to float, mapping None/0/"" to 0.0"""
+    return float(value) if value else 0.0
+
 
 class BinanceExchange(BaseExchange):
     """Real Binance exchange implementation via ccxt"""
@@ -18,17 +33,37 @@ class BinanceExchange(BaseExchange):
         self.api_key = config.get("api_key", "")
         self.api_secret = config.get("api_secret", "")
         self.client: Optional[ccxt_async.binance] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws_client = None  # ccxt.pro client, created on first watch
+        self._usdt_bases: frozenset = frozenset()
+        # Short-lived ticker cache coalesces repeated lookups within a tick
+        self._ticker_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._ticker_ttl = config.get("ticker_ttl", 0.1)
+        # Shared fetch_balance result for get_balance/get_positions
+        self._balance_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._balance_ttl = config.get("balance_ttl", 1.0)
         self._authenticated = bool(self.api_key and self.api_secret)
 
     async def initialize(self):
         """Initialize Binance connection via ccxt"""
         self.logger.info("Initializing Binance exchange...")
 
+        # Pooled keep-alive session with DNS caching instead of ccxt's default
+        connector = aiohttp.TCPConnector(
+            limit=200,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True,
+            ssl=ssl.create_default_context(cafile=certifi.where()),
+        )
+        self._session = aiohttp.ClientSession(connector=connector, trust_env=True)
+
         self.client = ccxt_async.binance(
             {
                 "apiKey": self.api_key if self.api_key else None,
                 "secret": self.api_secret if self.api_secret else None,
                 "enableRateLimit": True,
+                "session": self._session,
                 "options": {
                     "defaultType": "spot",
                 },
@@ -41,6 +76,13 @@ class BinanceExchange(BaseExchange):
 
         await self.client.load_markets()
 
+        # Base currencies with USDT spot markets, used to map balances
+        self._usdt_bases = frozenset(
+            m["base"]
+            for m in self.client.markets.values()
+            if m.get("quote") == "USDT" and m.get("spot")
+        )
+
         mode = "sandbox" if self.sandbox else "LIVE"
         auth = "authenticated" if self._authenticated else "public-only (no API keys)"
         self.logger.info(f"Binance exchange ready — {mode}, {auth}")
@@ -50,39 +92,68 @@ class BinanceExchange(BaseExchange):
         try:
             # ccxt returns [[timestamp_ms, open, high, low, close, volume], ...]
             return await self.client.fetch_ohlcv(symbol, timeframe, limit=limit)
-        except ccxt_async.NetworkError as e:
-            self.logger.error(f"Network error fetching OHLCV for {symbol}: {e}")
-            return []
-        except ccxt_async.ExchangeError as e:
-            self.logger.error(f"Exchange error fetching OHLCV for {symbol}: {e}")
-            return []
+        except ccxt_async.BaseError as e:
+            return self._log_and_return("get_ohlcv", symbol, e, [])
+
+    @property
+    def supports_ohlcv_stream(self) -> bool:
+        return ccxt_pro is not None
+
+    async def watch_ohlcv(self, symbol: str, timeframe: str) -> list:
+        """Wait for the next kline update over the Binance WebSocket stream.
+
+        Errors propagate so the caller can back off before resubscribing.
+        """
+        if ccxt_pro is None:
+            return await super().watch_ohlcv(symbol, timeframe)
+
+        if self._ws_client is None:
+            self._ws_client = ccxt_pro.binance(
+                {"enableRateLimit": True, "options": {"defaultType": "spot"}}
+            )
+            if self.sandbox:
+                self._ws_client.set_sandbox_mode(True)
+
+        return await self._ws_client.watch_ohlcv(symbol, timeframe)
 
     async def get_ticker(self, symbol: str) -> Dict[str, Any]:
         """Fetch last traded price from Binance"""
+        now = time.monotonic()
+        cached = self._ticker_cache.get(symbol)
+        if cached and now - cached[0] < self._ticker_ttl:
+            return dict(cached[1])  # Callers may mutate what they get back
+
         try:
-            ticker = await self.client.fetch_ticker(symbol)
-
-            def safe_float(val, default=0.0):
-                if val is None:
-                    return default
-                try:
-                    return float(val)
-                except (ValueError, TypeError):
-                    return default
-
-            return {
-                "last": safe_float(ticker.get("last")),
-                "bid": safe_float(ticker.get("bid")),
-                "ask": safe_float(ticker.get("ask")),
-                "volume": safe_float(ticker.get("volume")),
-                "percentage": safe_float(ticker.get("percentage")),
+            ticker = self._normalize_ticker(await self.client.fetch_ticker(symbol))
+            self._ticker_cache[symbol] = (now, ticker)
+            return dict(ticker)
+        except ccxt_async.BaseError as e:
+            return self._log_and_return(
+                "get_ticker",
+                symbol,
+                e,
+                {"last": 0, "bid": 0, "ask": 0, "volume": 0, "percentage": 0},
+            )
+
+    async def get_tickers(self, symbols: List[str]) -> Dict[str, Any]:
+        """Fetch tickers for several symbols in a single request"""
+        if not symbols:
+            return {}
+        if not self.client.has.get("fetchTickers"):
+            return await super().get_tickers(symbols)
+        try:
+            tickers = await self.client.fetch_tickers(symbols)
+            result = {
+                symbol: self._normalize_ticker(tickers[symbol])
+                for symbol in symbols
+                if symbol in tickers
             }
-        except ccxt_async.NetworkError as e:
-            self.logger.error(f"Network error fetching ticker for {symbol}: {e}")
-            return {"last": 0, "bid": 0, "ask": 0, "volume": 0, "percentage": 0}
-        except ccxt_async.ExchangeError as e:
-            self.logger.error(f"Exchange error fetching ticker for {symbol}: {e}")
-            return {"last": 0, "bid": 0, "ask": 0, "volume": 0, "percentage": 0}
+            now = time.monotonic()
+            for symbol, ticker in result.items():
+                self._ticker_cache[symbol] = (now, dict(ticker))
+            return result
+        except ccxt_async.BaseError as e:
+            return self._log_and_return("get_tickers", ",".join(symbols), e, {})
 
     async def create_market_buy_order(
         self, symbol: str, amount: float
@@ -91,6 +162,7 @@ class BinanceExchange(BaseExchange):
         self._require_auth("create_market_buy_order")
         try:
             order = await self.client.create_market_buy_order(symbol, amount)
+            self._balance_cache = None  # Fills change balances
             return self._normalize_order(order)
         except ccxt_async.InsufficientFunds as e:
             self.logger.error(f"Insufficient funds for buy {symbol}: {e}")
@@ -98,12 +170,8 @@ class BinanceExchange(BaseExchange):
         except ccxt_async.InvalidOrder as e:
             self.logger.error(f"Invalid buy order for {symbol}: {e}")
             return {}
-        except ccxt_async.NetworkError as e:
-            self.logger.error(f"Network error placing buy for {symbol}: {e}")
-            return {}
-        except ccxt_async.ExchangeError as e:
-            self.logger.error(f"Exchange error placing buy for {symbol}: {e}")
-            return {}
+        except ccxt_async.BaseError as e:
+            return self._log_and_return("create_market_buy_order", symbol, e, {})
 
     async def create_market_sell_order(
         self, symbol: str, amount: float
@@ -112,6 +180,7 @@ class BinanceExchange(BaseExchange):
         self._require_auth("create_market_sell_order")
         try:
             order = await self.client.create_market_sell_order(symbol, amount)
+            self._balance_cache = None  # Fills change balances
             return self._normalize_order(order)
         except ccxt_async.InsufficientFunds as e:
             self.logger.error(f"Insufficient funds for sell {symbol}: {e}")
@@ -119,12 +188,8 @@ class BinanceExchange(BaseExchange):
         except ccxt_async.InvalidOrder as e:
             self.logger.error(f"Invalid sell order for {symbol}: {e}")
             return {}
-        except ccxt_async.NetworkError as e:
-            self.logger.error(f"Network error placing sell for {symbol}: {e}")
-            return {}
-        except ccxt_async.ExchangeError as e:
-            self.logger.error(f"Exchange error placing sell for {symbol}: {e}")
-            return {}
+        except ccxt_async.BaseError as e:
+            return self._log_and_return("create_market_sell_order", symbol, e, {})
 
     async def get_positions(self) -> Dict[str, Any]:
         """Map Binance spot balances to position dicts.
@@ -142,70 +207,82 @@ class BinanceExchange(BaseExchange):
 
         self._require_auth("get_positions")
         try:
-            balance = await self.client.fetch_balance()
+            balance = await self._fetch_balance_cached()
             positions = {}
 
-            # Find which base currencies have USDT spot markets
-            tradeable_bases = {
-                m["base"]
-                for m in self.client.markets.values()
-                if m.get("quote") == "USDT" and m.get("spot")
+            # Only non-zero balances with a USDT spot market become positions
+            holdings = {
+                f"{currency}/USDT": _fnum(total)
+                for currency, total in balance.get("total", {}).items()
+                if currency != "USDT"
+                and currency in self._usdt_bases
+                and _fnum(total) > 0
             }
+            if not holdings:
+                return positions
 
-            for currency, total in balance.get("total", {}).items():
-                total = float(total) if total else 0.0
-                if total <= 0 or currency == "USDT":
-                    continue
-                if currency not in tradeable_bases:
-                    continue
-
-                symbol = f"{currency}/USDT"
-                current_price = await self.get_ticker(symbol)
+            # Price all holdings with one bulk ticker request
+            tickers = await self.get_tickers(list(holdings))
 
+            for symbol, quantity in holdings.items():
                 positions[symbol] = {
                     "symbol": symbol,
-                    "quantity": total,
-                    "entry_price": current_price,
+                    "quantity": quantity,
+                    "entry_price": tickers.get(symbol, {}).get("last", 0.0),
                     "unrealized_pnl": 0.0,
                     "side": "long",
                 }
 
             return positions
 
-        except ccxt_async.AuthenticationError as e:
-            self.logger.error(f"Auth error fetching positions: {e}")
-            return {}
-        except ccxt_async.NetworkError as e:
-            self.logger.error(f"Network error fetching positions: {e}")
-            return {}
-        except ccxt_async.ExchangeError as e:
-            self.logger.error(f"Exchange error fetching positions: {e}")
-            return {}
+        except ccxt_async.AuthenticationError:
+            raise  # A rejected key must not look like an empty account
+        except ccxt_async.BaseError as e:
+            return self._log_and_return("get_positions", "account", e, {})
 
     async def get_balance(self) -> Dict[str, Any]:
         """Fetch account balance from Binance"""
         self._require_auth("get_balance")
         try:
-            balance = await self.client.fetch_balance()
+            balance = await self._fetch_balance_cached()
             return balance.get("total", {})
-        except ccxt_async.AuthenticationError as e:
-            self.logger.error(f"Auth error fetching balance: {e}")
-            return {}
-        except ccxt_async.NetworkError as e:
-            self.logger.error(f"Network error fetching balance: {e}")
-            return {}
-        except ccxt_async.ExchangeError as e:
-            self.logger.error(f"Exchange error fetching balance: {e}")
-            return {}
+        except ccxt_async.AuthenticationError:
+            raise  # A rejected key must not look like an empty account
+        except ccxt_async.BaseError as e:
+            return self._log_and_return("get_balance", "account", e, {})
 
     async def close(self):
         """Close the ccxt client and release aiohttp session"""
+        if self._ws_client:
+            await self._ws_client.close()
+            self._ws_client = None
         if self.client:
             await self.client.close()
             self.logger.info("Binance exchange connection closed")
+        # ccxt doesn't close sessions it was handed - release ours explicitly
+        if self._session:
+            await self._session.close()
+            self._session = None
 
     # -- helpers --
 
+    async def _fetch_balance_cached(self) -> Dict[str, Any]:
+        """fetch_balance shared by get_balance and get_positions within a TTL"""
+        now = time.monotonic()
+        if self._balance_cache and now - self._balance_cache[0] < self._balance_ttl:
+            return self._balance_cache[1]
+
+        balance = await self.client.fetch_balance()
+        self._balance_cache = (now, balance)
+        return balance
+
+    def _log_and_return(self, method: str, target: str, error: Exception, default):
+        """Log a ccxt failure and hand back the method's fallback value"""
+        self.logger.error(
+            "%s in %s for %s: %s", type(error).__name__, method, target, error
+        )
+        return default
+
     def _require_auth(self, method_name: str):
         """Raise if API keys are not configured"""
         if not self._authenticated:
@@ -214,6 +291,26 @@ class BinanceExchange(BaseExchange):
                 f"Set exchange.api_key and exchange.api_secret in config."
             )
 
+    @staticmethod
+    def _normalize_ticker(ticker: dict) -> Dict[str, Any]:
+        """Convert ccxt unified ticker to the format TradingEngine expects"""
+
+        def safe_float(val, default=0.0):
+            if val is None:
+                return default
+            try:
+                return float(val)
+            except (ValueError, TypeError):
+                return default
+
+        return {
+            "last": safe_float(ticker.get("last")),
+            "bid": safe_float(ticker.get("bid")),
+            "ask": safe_float(ticker.get("ask")),
+            "volume": safe_float(ticker.get("volume")),
+            "percentage": safe_float(ticker.get("percentage")),
+        }
+
     @staticmethod
     def _normalize_order(order: dict) -> Dict[str, Any]:
         """Convert ccxt unified order to the format TradingEngine expects"""
@@ -221,8 +318,8 @@ class BinanceExchange(BaseExchange):
             "id": order.get("id", ""),
             "symbol": order.get("symbol", ""),
             "side": order.get("side", ""),
-            "amount": float(order.get("amount", 0) or 0),
-            "price": float(order.get("average", 0) or order.get("price", 0) or 0),
-            "filled": float(order.get("filled", 0) or 0),
+            "amount": _fnum(order.get("amount")),
+            "price": _fnum(order.get("average") or order.get("price")),
+            "filled": _fnum(order.get("filled")),
             "status": order.get("status", ""),
         }
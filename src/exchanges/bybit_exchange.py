@@ -4,14 +4,106 @@ Supports paper trading via Bybit testnet API and TradingView webhook integration
 """
 
 import asyncio
-import hashlib
-import hmac
+import random
 import time
-from typing import Dict, Any, Optional
-from datetime import datetime
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from typing import Deque, Dict, Any, Optional, Tuple
+
+import numpy as np
 
 from src.exchanges.exchange_factory import BaseExchange
 from src.utils.logger import get_logger
+from src.utils import fast_json
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+_INTERVAL_MS: Dict[str, int] = {
+    "1m": 60000,
+    "5m": 300000,
+    "15m": 900000,
+    "1h": 3600000,
+    "4h": 14400000,
+    "1d": 86400000,
+}
+
+_BASE_PRICES: Dict[str, float] = {
+    "BTC/USDT": 67000,
+    "BTCUSDT": 67000,
+    "ETH/USDT": 3200,
+    "ETHUSDT": 3200,
+    "SOL/USDT": 140,
+    "SOLUSDT": 140,
+    "BNB/USDT": 580,
+    "BNBUSDT": 580,
+    "XRP/USDT": 0.55,
+    "XRPUSDT": 0.55,
+    "EUR/USD": 1.08,
+    "EURUSD": 1.08,
+    "GBP/USD": 1.26,
+    "GBPUSD": 1.26,
+    "USD/JPY": 148,
+    "USDJPY": 148,
+}
+
+
+if msgspec is not None:
+
+    class WebhookPayload(msgspec.Struct):
+        """TradingView alert body"""
+
+        action: str
+        symbol: str = "BTC/USDT"
+        amount: float = 0.0
+
+    def decode_webhook(raw: bytes) -> "WebhookPayload":
+        """Parse and validate a webhook body in a single pass"""
+        try:
+            # strict=False lets TradingView send numbers as strings
+            return msgspec.json.decode(raw, type=WebhookPayload, strict=False)
+        except (msgspec.ValidationError, msgspec.DecodeError) as e:
+            raise ValueError(str(e)) from e
+
+else:
+
+    @dataclass(slots=True)
+    class WebhookPayload:
+        """TradingView alert body"""
+
+        action: str
+        symbol: str = "BTC/USDT"
+        amount: float = 0.0
+
+    def decode_webhook(raw: bytes) -> "WebhookPayload":
+        """Parse and validate a webhook body"""
+        try:
+            data = fast_json.loads(raw)
+            return WebhookPayload(
+                action=str(data["action"]),
+                symbol=str(data.get("symbol", "BTC/USDT")),
+                amount=float(data.get("amount", 0.0)),
+            )
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"Invalid webhook payload: {e}") from e
+
+
+@dataclass(slots=True)
+class Position:
+    """Simulated spot position held on the testnet account"""
+
+    symbol: str
+    amount: float
+    avg_price: float
+    side: str = "buy"
+
+    @property
+    def quantity(self) -> float:
+        return self.amount
 
 
 class BybitTestnetExchange(BaseExchange):
@@ -25,10 +117,16 @@ class BybitTestnetExchange(BaseExchange):
         self.base_url = "https://api-testnet.bybit.com"
 
         self.wallet_balance = config.get("initial_balance", 100000)
-        self.positions = {}
-        self.orders = []
+        self.positions: Dict[str, Position] = {}
+        self.orders: Deque[Dict[str, Any]] = deque(
+            maxlen=config.get("max_order_history", 10000)
+        )
+        self._rng = random.Random()
+        self._np_rng = np.random.default_rng()
 
-        self.logger = get_logger(__name__)
+        # Short-lived ticker cache coalesces repeated lookups within a tick
+        self._ticker_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._ticker_ttl = config.get("ticker_ttl", 0.1)
 
     async def initialize(self):
         """Initialize Bybit testnet connection"""
@@ -45,66 +143,57 @@ class BybitTestnetExchange(BaseExchange):
 
     async def get_ohlcv(self, symbol: str, timeframe: str, limit: int = 100) -> list:
         """Get OHLCV data from Bybit testnet"""
-        import random
-
         base_price = self._get_base_price(symbol)
-        ohlcv_data = []
-
-        interval_map = {
-            "1m": 60000,
-            "5m": 300000,
-            "15m": 900000,
-            "1h": 3600000,
-            "4h": 14400000,
-            "1d": 86400000,
-        }
-        interval_ms = interval_map.get(timeframe, 300000)
-
-        for i in range(limit):
-            timestamp = int(time.time() * 1000) - (limit - i) * interval_ms
-            price = base_price + random.uniform(-0.02, 0.02) * base_price
-
-            ohlcv_data.append(
-                [
-                    timestamp,
-                    price * 0.998,
-                    price * 1.003,
-                    price * 0.996,
-                    price,
-                    random.uniform(100, 10000),
-                ]
-            )
+
+        interval_ms = _INTERVAL_MS.get(timeframe, 300000)
+
+        # Draw all candles in one vectorized batch
+        now_ms = int(time.time() * 1000)
+        timestamps = now_ms - (limit - np.arange(limit)) * interval_ms
+        close = base_price + self._np_rng.uniform(-0.02, 0.02, limit) * base_price
+        volume = self._np_rng.uniform(100, 10000, limit)
+
+        ohlcv_data = np.column_stack(
+            [timestamps, close * 0.998, close * 1.003, close * 0.996, close, volume]
+        ).tolist()
+        # Keep integer millisecond timestamps like the exchange API returns
+        for candle, timestamp in zip(ohlcv_data, timestamps.tolist()):
+            candle[0] = timestamp
 
         return ohlcv_data
 
     async def get_ticker(self, symbol: str) -> Dict[str, Any]:
         """Get current ticker price from Bybit"""
-        import random
+        now = time.monotonic()
+        cached = self._ticker_cache.get(symbol)
+        if cached and now - cached[0] < self._ticker_ttl:
+            return dict(cached[1])  # Callers may mutate what they get back
 
         base_price = self._get_base_price(symbol)
         spread = base_price * 0.0002
 
-        return {
+        ticker = {
             "symbol": symbol,
-            "last": base_price + random.uniform(-0.001, 0.001) * base_price,
+            "last": base_price + self._rng.uniform(-0.001, 0.001) * base_price,
             "bid": base_price - spread,
             "ask": base_price + spread,
-            "volume": random.uniform(1000, 100000),
-            "percentage": random.uniform(-5, 5),
-            "timestamp": datetime.now().isoformat(),
+            "volume": self._rng.uniform(1000, 100000),
+            "percentage": self._rng.uniform(-5, 5),
+            "timestamp": int(time.time() * 1000),
         }
+        self._ticker_cache[symbol] = (now, ticker)
+        return dict(ticker)
 
     async def create_market_buy_order(
         self, symbol: str, amount: float
     ) -> Dict[str, Any]:
         """Create market buy order on Bybit testnet"""
-        import random
-
         ticker = await self.get_ticker(symbol)
         price = ticker["last"]
+        now_ms = int(time.time() * 1000)
 
         order = {
-            "id": f"bybit_buy_{int(time.time())}_{random.randint(1000, 9999)}",
+            "id": self._make_order_id("buy", now_ms),
             "symbol": symbol,
             "side": "buy",
             "amount": amount,
@@ -112,7 +201,7 @@ class BybitTestnetExchange(BaseExchange):
             "filled": amount,
             "status": "filled",
             "fee": amount * price * 0.0006,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_ms,
             "exchange": "bybit_testnet",
         }
 
@@ -122,25 +211,14 @@ class BybitTestnetExchange(BaseExchange):
 
             if symbol in self.positions:
                 existing = self.positions[symbol]
-                total = existing["amount"] + amount
-                avg_price = (
-                    existing["avg_price"] * existing["amount"] + price * amount
+                total = existing.amount + amount
+                existing.avg_price = (
+                    existing.avg_price * existing.amount + price * amount
                 ) / total
-                self.positions[symbol] = {
-                    "symbol": symbol,
-                    "quantity": total,
-                    "amount": total,
-                    "avg_price": avg_price,
-                    "side": "buy",
-                }
+                existing.amount = total
+                existing.side = "buy"
             else:
-                self.positions[symbol] = {
-                    "symbol": symbol,
-                    "quantity": amount,
-                    "amount": amount,
-                    "avg_price": price,
-                    "side": "buy",
-                }
+                self.positions[symbol] = Position(symbol, amount, price)
 
             self.orders.append(order)
             self.logger.info(f"✅ BUY executed: {amount} {symbol} @ ${price:,.2f}")
@@ -155,20 +233,19 @@ class BybitTestnetExchange(BaseExchange):
         self, symbol: str, amount: float
     ) -> Dict[str, Any]:
         """Create market sell order on Bybit testnet"""
-        import random
-
         if symbol not in self.positions:
             return {"id": None, "status": "rejected", "error": "No position"}
 
         position = self.positions[symbol]
-        if position["amount"] < amount:
+        if position.amount < amount:
             return {"id": None, "status": "rejected", "error": "Insufficient position"}
 
         ticker = await self.get_ticker(symbol)
         price = ticker["last"]
+        now_ms = int(time.time() * 1000)
 
         order = {
-            "id": f"bybit_sell_{int(time.time())}_{random.randint(1000, 9999)}",
+            "id": self._make_order_id("sell", now_ms),
             "symbol": symbol,
             "side": "sell",
             "amount": amount,
@@ -176,15 +253,15 @@ class BybitTestnetExchange(BaseExchange):
             "filled": amount,
             "status": "filled",
             "fee": amount * price * 0.0006,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_ms,
             "exchange": "bybit_testnet",
         }
 
         proceeds = amount * price - order["fee"]
         self.wallet_balance += proceeds
 
-        position["amount"] -= amount
-        if position["amount"] <= 0:
+        position.amount -= amount
+        if position.amount <= 0:
             del self.positions[symbol]
 
         self.orders.append(order)
@@ -194,10 +271,12 @@ class BybitTestnetExchange(BaseExchange):
 
     async def get_balance(self) -> Dict[str, Any]:
         """Get account balance from Bybit testnet"""
-        total_in_positions = 0
-        for symbol, pos in self.positions.items():
-            ticker = await self.get_ticker(symbol)
-            total_in_positions += pos["amount"] * ticker["last"]
+        symbols = list(self.positions)
+        tickers = await asyncio.gather(*(self.get_ticker(s) for s in symbols))
+        total_in_positions = sum(
+            self.positions[symbol].amount * ticker["last"]
+            for symbol, ticker in zip(symbols, tickers)
+        )
 
         return {
             "USDT": {
@@ -210,16 +289,19 @@ class BybitTestnetExchange(BaseExchange):
 
     async def get_positions(self) -> Dict[str, Any]:
         """Get current positions"""
+        symbols = list(self.positions)
+        tickers = await asyncio.gather(*(self.get_ticker(s) for s in symbols))
+
         positions_data = {}
-        for symbol, pos in self.positions.items():
-            ticker = await self.get_ticker(symbol)
-            current_value = pos["amount"] * ticker["last"]
-            entry_value = pos["amount"] * pos["avg_price"]
+        for symbol, ticker in zip(symbols, tickers):
+            pos = self.positions[symbol]
+            current_value = pos.amount * ticker["last"]
+            entry_value = pos.amount * pos.avg_price
             pnl = current_value - entry_value
 
             positions_data[symbol] = {
-                "amount": pos["amount"],
-                "avg_price": pos["avg_price"],
+                "amount": pos.amount,
+                "avg_price": pos.avg_price,
                 "current_price": ticker["last"],
                 "pnl": pnl,
                 "pnl_percentage": (pnl / entry_value * 100) if entry_value > 0 else 0,
@@ -229,30 +311,20 @@ class BybitTestnetExchange(BaseExchange):
 
     async def get_order_history(self) -> list:
         """Get order history"""
-        return self.orders[-100:]
+        return list(islice(self.orders, max(0, len(self.orders) - 100), None))
+
+    def _make_order_id(self, side: str, now_ms: int) -> str:
+        """Build a simulated order id from side, epoch seconds and a random tag"""
+        return f"bybit_{side}_{now_ms // 1000}_{self._rng.randint(1000, 9999)}"
 
     def _get_base_price(self, symbol: str) -> float:
         """Get base price for symbol simulation"""
-        prices = {
-            "BTC/USDT": 67000,
-            "BTCUSDT": 67000,
-            "ETH/USDT": 3200,
-            "ETHUSDT": 3200,
-            "SOL/USDT": 140,
-            "SOLUSDT": 140,
-            "BNB/USDT": 580,
-            "BNBUSDT": 580,
-            "XRP/USDT": 0.55,
-            "XRPUSDT": 0.55,
-            "EUR/USD": 1.08,
-            "EURUSD": 1.08,
-            "GBP/USD": 1.26,
-            "GBPUSD": 1.26,
-            "USD/JPY": 148,
-            "USDJPY": 148,
-        }
+        price = _BASE_PRICES.get(symbol)
+        if price is not None:
+            return price
 
-        for key, price in prices.items():
+        # Fall back to a substring match for decorated symbols (e.g. "BTC/USDT:USDT")
+        for key, price in _BASE_PRICES.items():
             if key in symbol:
                 return price
         return 100.0
@@ -265,13 +337,14 @@ class TradingViewWebhookHandler:
         self.exchange = exchange
         self.logger = get_logger(__name__)
         self.webhook_queue = asyncio.Queue()
+        self._workers = []
 
-    async def handle_webhook(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_webhook(self, payload: WebhookPayload) -> Dict[str, Any]:
         """Process TradingView webhook and execute trade"""
         try:
-            action = payload.get("action", "").lower()
-            symbol = payload.get("symbol", "BTC/USDT")
-            amount = float(payload.get("amount", 0))
+            action = payload.action.lower()
+            symbol = payload.symbol
+            amount = payload.amount
 
             self.logger.info(f"📥 Webhook received: {action} {amount} {symbol}")
 
@@ -292,18 +365,54 @@ class TradingViewWebhookHandler:
             self.logger.error(f"❌ Webhook error: {e}")
             return {"status": "error", "message": str(e)}
 
-    async def start_listener(self, host: str = "0.0.0.0", port: int = 8080):
-        """Start webhook listener server"""
+    async def _worker(self):
+        """Drain queued webhooks and execute them"""
+        while True:
+            payload = await self.webhook_queue.get()
+            try:
+                await self.handle_webhook(payload)
+            finally:
+                self.webhook_queue.task_done()
+
+    def start_workers(self, n_workers: int = 4):
+        """Start the queue workers that execute accepted webhooks"""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(n_workers)
+            ]
+
+    async def queue_webhook(self, request):
+        """aiohttp route: validate a webhook, queue it and acknowledge with 202"""
         from aiohttp import web
 
-        async def webhook_handler(request):
-            payload = await request.json()
-            result = await self.handle_webhook(payload)
-            return web.json_response(result)
+        try:
+            payload = decode_webhook(await request.read())
+        except ValueError as e:
+            return web.Response(status=400, text=str(e))
+        await self.webhook_queue.put(payload)
+        return web.json_response(
+            {"status": "queued"}, status=202, dumps=fast_json.dumps
+        )
+
+    async def start_listener(
+        self, host: str = "0.0.0.0", port: int = 8080, n_workers: int = 4
+    ):
+        """Start webhook listener server
+
+        Webhooks are acknowledged immediately with 202 and executed by a
+        pool of ``n_workers`` queue workers; runner.cleanup() drains them.
+        """
+        from aiohttp import web
 
         app = web.Application()
-        app.router.add_post("/webhook/tradingview", webhook_handler)
+        app.router.add_post("/webhook/tradingview", self.queue_webhook)
+
+        async def _drain(app):
+            await self.stop_workers()
 
+        app.on_cleanup.append(_drain)
+
+        self.start_workers(n_workers)
         runner = web.AppRunner(app)
         await runner.setup()
         site = web.TCPSite(runner, host, port)
@@ -315,3 +424,18 @@ class TradingViewWebhookHandler:
         )
 
         return runner
+
+    async def stop_workers(self, timeout: float = 30.0):
+        """Finish queued webhooks, then cancel the queue workers"""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self.webhook_queue.join(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                f"⚠️ {self.webhook_queue.qsize()} webhooks still queued at shutdown"
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
@@ -4,17 +4,102 @@ Uses real market data from Binance but simulates all trades locally.
 Perfect for testing strategies without risking real funds.
 """
 
-import json
+import asyncio
+import gzip
+import logging
+import os
+import threading
 import time
+import uuid
+from collections import deque
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Deque, Dict, Any, List, Optional, Tuple
 
 from src.exchanges.exchange_factory import BaseExchange
 from src.exchanges.binance_exchange import BinanceExchange
+from src.utils import fast_json
 from src.utils.logger import get_logger
 
 
+@lru_cache(maxsize=256)
+def _split_symbol(symbol: str) -> Tuple[str, str]:
+    """Split "BTC/USDT" into ("BTC", "USDT")"""
+    base, quote = symbol.split("/")
+    return base, quote
+
+
+@lru_cache(maxsize=256)
+def _usdt_pair(currency: str) -> str:
+    """Build the USDT spot pair for a currency"""
+    return f"{currency}/USDT"
+
+
+def _live_log_path(archive: Path) -> Path:
+    """Plain JSONL file a run appends to before it is gzipped into archive"""
+    return archive.with_suffix("")
+
+
+def _archive_log_path(live: Path) -> Path:
+    """Gzip archive a plain JSONL run log is compressed into"""
+    return live.with_name(live.name + ".gz")
+
+
+def _owner_path(live: Path) -> Path:
+    """File holding the pid of the process writing a live run log"""
+    return live.with_suffix(".pid")
+
+
+def _owner_alive(live: Path) -> bool:
+    """Whether the process that owns a live run log is still running"""
+    try:
+        pid = int(_owner_path(live).read_text())
+    except (OSError, ValueError):
+        # No owner recorded: the writer died before (or while) claiming it
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _parse_trade_lines(lines) -> List[Dict[str, Any]]:
+    """Decode JSONL records, skipping a record torn by a crash mid-write"""
+    trades = []
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            trades.append(fast_json.loads(line))
+        except ValueError:
+            continue
+    return trades
+
+
+def load_trade_log(path: Path) -> List[Dict[str, Any]]:
+    """Read every trade from one run's DryRun trade log.
+
+    Finished runs are in the gzip archive; a run that never reached close()
+    (killed, crashed) is still plain JSONL next to it and is read as well.
+    """
+    path = Path(path)
+    trades: List[Dict[str, Any]] = []
+    if path.exists():
+        with gzip.open(path, "rb") as f:
+            trades.extend(_parse_trade_lines(f))
+    live = _live_log_path(path)
+    if live.exists():
+        with open(live, "rb") as f:
+            trades.extend(_parse_trade_lines(f))
+    return trades
+
+
 class DryRunExchange(BaseExchange):
     """Paper trading exchange that reads real data but simulates trades locally.
 
@@ -24,51 +109,119 @@ class DryRunExchange(BaseExchange):
     - All trades are logged for post-analysis
     """
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        shared_exchange: Optional[BinanceExchange] = None,
+    ):
         super().__init__(config)
         self.logger = get_logger("DryRunExchange")
 
-        # Real exchange for market data only (public endpoints, no auth needed)
-        self._market_data_config = {
-            "sandbox": config.get("sandbox", False),
-            "api_key": "",
-            "api_secret": "",
-        }
-        self._real_exchange: Optional[BinanceExchange] = None
+        self._market_data_config = self.market_data_config(config)
+        # An already-initialized exchange may be shared to reuse its
+        # connection pool; we only close the one we create ourselves
+        self._real_exchange: Optional[BinanceExchange] = shared_exchange
+        self._owns_real_exchange = shared_exchange is None
 
         # Paper portfolio
         initial_capital = config.get("initial_capital", 10000.0)
         self._balance: Dict[str, float] = {"USDT": float(initial_capital)}
+        # Non-zero holdings view, rebuilt lazily after the balance changes
+        self._held: Optional[Dict[str, float]] = None
         self._order_counter = 0
 
         # Trade log
-        self._trade_log = []
+        # In-memory tail for stats; the full history lives in the JSONL file
+        self._trade_log: Deque[Dict[str, Any]] = deque(maxlen=10000)
         self._state_file = Path("reports/dryrun_state.json")
-        self._trade_log_file = Path("reports/dryrun_trades.json")
+        self._reports_ready = False
+        # Each run gets its own log, named in initialize(). Trades are
+        # appended to plain JSONL as they happen so the log stays readable
+        # if the process dies; close() gzips it into the archive
+        self._trade_log_archive: Optional[Path] = None
+        self._trade_log_file: Optional[Path] = None
+        self._trade_log_fh = None
+        self._trade_log_flush_every = config.get("trade_log_flush_every", 20)
+        self._unflushed_trades = 0
+
+        # Background persistence: order paths mark state dirty and a single
+        # task coalesces writes off the event loop
+        self._dirty: Optional[asyncio.Event] = None
+        self._persist_task: Optional[asyncio.Task] = None
+        self._persist_delay = config.get("persist_interval", 0.1)
+        self._persist_stop = False
+        # Serializes the background writer with the final save in close()
+        self._state_lock = threading.Lock()
 
         # Stats
-        self._start_time = None
+        self._start_time_ns: Optional[int] = None
         self._total_orders = 0
         self._failed_orders = 0
 
+    @staticmethod
+    def market_data_config(config: Dict[str, Any]) -> Dict[str, Any]:
+        """BinanceExchange config for the real market data behind a dry run.
+
+        Callers building a ``shared_exchange`` use this so it matches the
+        one DryRunExchange would create itself.
+        """
+        # Public endpoints only, so no auth is needed
+        return {
+            "sandbox": config.get("sandbox", False),
+            "api_key": "",
+            "api_secret": "",
+            # Order pricing and position marks share the real exchange's cache
+            "ticker_ttl": config.get("ticker_cache_ttl", 0.5),
+        }
+
     async def initialize(self):
         """Initialize real exchange connection for market data"""
         self.logger.info("Initializing DryRun Exchange (paper trading)...")
 
-        # Create real exchange for public market data
-        self._real_exchange = BinanceExchange(self._market_data_config)
-        await self._real_exchange.initialize()
+        # Create real exchange for public market data (once)
+        if self._real_exchange is None:
+            self._real_exchange = BinanceExchange(self._market_data_config)
+            self._owns_real_exchange = True
+            await self._real_exchange.initialize()
 
-        self._start_time = datetime.now()
+        self._start_time_ns = time.time_ns()
 
         # Load saved state if exists
         self._load_state()
 
+        self._ensure_reports_dir()
+        # Logs left behind by runs that died are archived first; logs of
+        # runs still going in other processes are left to their owners
+        reports_dir = self._state_file.parent
+        for leftover in reports_dir.glob("dryrun_trades_*.jsonl"):
+            self._archive_trade_log(leftover)
+        # pid and a random suffix keep runs started in the same second apart
+        run_id = "%s_%d_%s" % (
+            datetime.fromtimestamp(self._start_time_ns / 1e9).strftime(
+                "%Y%m%d_%H%M%S"
+            ),
+            os.getpid(),
+            uuid.uuid4().hex[:6],
+        )
+        self._trade_log_archive = reports_dir / f"dryrun_trades_{run_id}.jsonl.gz"
+        self._trade_log_file = _live_log_path(self._trade_log_archive)
+        # Claim the log before creating it so no other run archives it
+        _owner_path(self._trade_log_file).write_text(str(os.getpid()))
+        self._trade_log_fh = open(self._trade_log_file, "ab")
+
+        self._dirty = asyncio.Event()
+        self._persist_task = asyncio.create_task(self._persist_loop())
+
         self.logger.info(
             f"DryRun Exchange ready - Starting balance: "
-            f"{json.dumps({k: v for k, v in self._balance.items() if v > 0})}"
+            f"{fast_json.dumps(self._held_balances())}"
         )
 
+    @property
+    def trade_log_path(self) -> Optional[Path]:
+        """Gzip archive holding this run's trades once the exchange is closed"""
+        return self._trade_log_archive
+
     async def get_ohlcv(self, symbol: str, timeframe: str, limit: int = 100) -> list:
         """Fetch real OHLCV data from Binance"""
         if not self._real_exchange:
@@ -81,6 +234,24 @@ class DryRunExchange(BaseExchange):
             return {"last": 0, "bid": 0, "ask": 0, "volume": 0, "percentage": 0}
         return await self._real_exchange.get_ticker(symbol)
 
+    @property
+    def supports_ohlcv_stream(self) -> bool:
+        return bool(
+            self._real_exchange and self._real_exchange.supports_ohlcv_stream
+        )
+
+    async def watch_ohlcv(self, symbol: str, timeframe: str) -> list:
+        """Stream real kline updates from Binance"""
+        if not self._real_exchange:
+            return await super().watch_ohlcv(symbol, timeframe)
+        return await self._real_exchange.watch_ohlcv(symbol, timeframe)
+
+    async def get_tickers(self, symbols: List[str]) -> Dict[str, Any]:
+        """Fetch real ticker prices for several symbols from Binance"""
+        if not self._real_exchange:
+            return {}
+        return await self._real_exchange.get_tickers(symbols)
+
     async def create_market_buy_order(
         self, symbol: str, amount: float
     ) -> Dict[str, Any]:
@@ -93,11 +264,11 @@ class DryRunExchange(BaseExchange):
             price = ticker.get("last", 0) if isinstance(ticker, dict) else ticker
             if not price or price <= 0:
                 self._failed_orders += 1
-                self.logger.error(f"DryRun: Cannot get price for {symbol}")
+                self.logger.error("DryRun: Cannot get price for %s", symbol)
                 return {}
 
             # Parse symbol (e.g., "BTC/USDT" -> base="BTC", quote="USDT")
-            base, quote = symbol.split("/")
+            base, quote = _split_symbol(symbol)
             cost = price * amount
 
             # Check if we have enough quote currency
@@ -105,41 +276,35 @@ class DryRunExchange(BaseExchange):
             if available < cost:
                 self._failed_orders += 1
                 self.logger.warning(
-                    f"DryRun: Insufficient {quote} for buy {amount} {symbol} "
-                    f"(need {cost:.2f}, have {available:.2f})"
+                    "DryRun: Insufficient %s for buy %s %s (need %.2f, have %.2f)",
+                    quote,
+                    amount,
+                    symbol,
+                    cost,
+                    available,
                 )
                 return {}
 
             # Execute paper trade
             self._balance[quote] = available - cost
             self._balance[base] = self._balance.get(base, 0.0) + amount
+            self._held = None
 
-            self._order_counter += 1
-            order = {
-                "id": f"dryrun_buy_{self._order_counter}",
-                "symbol": symbol,
-                "side": "buy",
-                "amount": amount,
-                "price": price,
-                "cost": cost,
-                "filled": amount,
-                "status": "closed",
-                "timestamp": datetime.now().isoformat(),
-            }
-
-            self._log_trade(order)
-            self._save_state()
+            order = self._record_fill("buy", symbol, amount, price, cost)
 
-            self.logger.info(
-                f"DryRun BUY: {amount:.6f} {base} @ ${price:,.2f} "
-                f"(cost: ${cost:.2f}) | USDT remaining: ${self._balance.get('USDT', 0):.2f}"
-            )
+            # Thousands separators need format(), so only build it when shown
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    f"DryRun BUY: {amount:.6f} {base} @ ${price:,.2f} "
+                    f"(cost: ${cost:.2f}) | USDT remaining: "
+                    f"${self._balance.get('USDT', 0):.2f}"
+                )
 
             return order
 
         except Exception as e:
             self._failed_orders += 1
-            self.logger.error(f"DryRun buy error: {e}")
+            self.logger.error("DryRun buy error: %s", e)
             return {}
 
     async def create_market_sell_order(
@@ -153,10 +318,10 @@ class DryRunExchange(BaseExchange):
             price = ticker.get("last", 0) if isinstance(ticker, dict) else ticker
             if not price or price <= 0:
                 self._failed_orders += 1
-                self.logger.error(f"DryRun: Cannot get price for {symbol}")
+                self.logger.error("DryRun: Cannot get price for %s", symbol)
                 return {}
 
-            base, quote = symbol.split("/")
+            base, quote = _split_symbol(symbol)
             proceeds = price * amount
 
             # Check if we have enough base currency
@@ -164,80 +329,83 @@ class DryRunExchange(BaseExchange):
             if available < amount:
                 self._failed_orders += 1
                 self.logger.warning(
-                    f"DryRun: Insufficient {base} for sell {amount} {symbol} "
-                    f"(have {available:.6f})"
+                    "DryRun: Insufficient %s for sell %s %s (have %.6f)",
+                    base,
+                    amount,
+                    symbol,
+                    available,
                 )
                 return {}
 
             # Execute paper trade
             self._balance[base] = available - amount
             self._balance[quote] = self._balance.get(quote, 0.0) + proceeds
+            self._held = None
 
-            self._order_counter += 1
-            order = {
-                "id": f"dryrun_sell_{self._order_counter}",
-                "symbol": symbol,
-                "side": "sell",
-                "amount": amount,
-                "price": price,
-                "cost": proceeds,
-                "filled": amount,
-                "status": "closed",
-                "timestamp": datetime.now().isoformat(),
-            }
-
-            self._log_trade(order)
-            self._save_state()
+            order = self._record_fill("sell", symbol, amount, price, proceeds)
 
-            self.logger.info(
-                f"DryRun SELL: {amount:.6f} {base} @ ${price:,.2f} "
-                f"(proceeds: ${proceeds:.2f}) | USDT total: ${self._balance.get('USDT', 0):.2f}"
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info(
+                    f"DryRun SELL: {amount:.6f} {base} @ ${price:,.2f} "
+                    f"(proceeds: ${proceeds:.2f}) | USDT total: "
+                    f"${self._balance.get('USDT', 0):.2f}"
+                )
 
             return order
 
         except Exception as e:
             self._failed_orders += 1
-            self.logger.error(f"DryRun sell error: {e}")
+            self.logger.error("DryRun sell error: %s", e)
             return {}
 
     async def get_positions(self) -> Dict[str, Any]:
         """Get simulated positions from paper portfolio"""
         positions = {}
 
-        for currency, amount in self._balance.items():
-            if amount <= 0 or currency == "USDT":
-                continue
+        holdings = {
+            _usdt_pair(currency): amount
+            for currency, amount in self._held_balances().items()
+            if currency != "USDT"
+        }
+        if not holdings:
+            return positions
 
-            symbol = f"{currency}/USDT"
-            try:
-                ticker = await self.get_ticker(symbol)
-                current_price = (
-                    ticker.get("last", 0) if isinstance(ticker, dict) else ticker
-                )
-                if current_price and current_price > 0:
-                    positions[symbol] = {
-                        "symbol": symbol,
-                        "quantity": amount,
-                        "entry_price": current_price,
-                        "unrealized_pnl": 0.0,
-                        "side": "long",
-                    }
-            except Exception:
-                pass
+        # Price every holding with one batched ticker request
+        try:
+            tickers = await self.get_tickers(list(holdings))
+        except Exception:
+            return positions
+
+        for symbol, amount in holdings.items():
+            current_price = tickers.get(symbol, {}).get("last", 0)
+            if current_price and current_price > 0:
+                positions[symbol] = {
+                    "symbol": symbol,
+                    "quantity": amount,
+                    "entry_price": current_price,
+                    "unrealized_pnl": 0.0,
+                    "side": "long",
+                }
 
         return positions
 
     async def get_balance(self) -> Dict[str, Any]:
         """Get paper portfolio balance"""
-        return {k: v for k, v in self._balance.items() if v > 0}
+        return dict(self._held_balances())
 
     async def close(self):
         """Close real exchange connection and save final state"""
+        if self._persist_task:
+            # Cancelling would abandon a write already running in a worker
+            # thread, so ask the loop to finish and wait for it instead
+            self._persist_stop = True
+            self._dirty.set()
+            await asyncio.gather(self._persist_task, return_exceptions=True)
+            self._persist_task = None
         self._save_state()
-        self._save_trade_log()
+        self._close_trade_log()
 
-        if self._real_exchange:
+        if self._real_exchange and self._owns_real_exchange:
             await self._real_exchange.close()
 
         self.logger.info(
@@ -248,11 +416,13 @@ class DryRunExchange(BaseExchange):
     def get_stats(self) -> Dict[str, Any]:
         """Get dry run statistics"""
         uptime = 0
-        if self._start_time:
-            uptime = (datetime.now() - self._start_time).total_seconds()
+        start_time = None
+        if self._start_time_ns:
+            uptime = (time.time_ns() - self._start_time_ns) / 1e9
+            start_time = datetime.fromtimestamp(self._start_time_ns / 1e9).isoformat()
 
         return {
-            "start_time": self._start_time.isoformat() if self._start_time else None,
+            "start_time": start_time,
             "uptime_seconds": uptime,
             "total_orders": self._total_orders,
             "failed_orders": self._failed_orders,
@@ -261,40 +431,116 @@ class DryRunExchange(BaseExchange):
                 if self._total_orders > 0
                 else 100.0
             ),
-            "balance": {k: v for k, v in self._balance.items() if v > 0},
+            "balance": dict(self._held_balances()),
             "trade_count": len(self._trade_log),
+            "trade_log": (
+                str(self._trade_log_archive) if self._trade_log_archive else None
+            ),
         }
 
+    def _record_fill(
+        self, side: str, symbol: str, amount: float, price: float, cost: float
+    ) -> Dict[str, Any]:
+        """Build the order result for a simulated fill, log it and mark state dirty"""
+        self._order_counter += 1
+        order = {
+            "id": f"dryrun_{side}_{self._order_counter}",
+            "symbol": symbol,
+            "side": side,
+            "amount": amount,
+            "price": price,
+            "cost": cost,
+            "filled": amount,
+            "status": "closed",
+            # Epoch milliseconds like ccxt; formatted only when read
+            "timestamp": time.time_ns() // 1_000_000,
+        }
+        self._log_trade(order)
+        self._mark_dirty()
+        return order
+
+    def _held_balances(self) -> Dict[str, float]:
+        """Non-zero balances, cached until the next fill"""
+        if self._held is None:
+            self._held = {k: v for k, v in self._balance.items() if v > 0}
+        return self._held
+
     def _log_trade(self, order: Dict[str, Any]):
         """Log trade for analysis"""
         self._trade_log.append(order)
-        # Keep log bounded
-        if len(self._trade_log) > 10000:
-            self._trade_log = self._trade_log[-10000:]
 
-    def _save_state(self):
-        """Persist portfolio state to disk"""
+        if self._trade_log_fh is None:
+            return
         try:
-            Path("reports").mkdir(exist_ok=True)
-            state = {
-                "balance": self._balance,
-                "order_counter": self._order_counter,
-                "total_orders": self._total_orders,
-                "failed_orders": self._failed_orders,
-                "last_saved": datetime.now().isoformat(),
-            }
-            with open(self._state_file, "w") as f:
-                json.dump(state, f, indent=2)
+            self._trade_log_fh.write(fast_json.dumpb(order, newline=True))
+            self._unflushed_trades += 1
+            if self._unflushed_trades >= self._trade_log_flush_every:
+                self._trade_log_fh.flush()
+                self._unflushed_trades = 0
+        except Exception as e:
+            self.logger.error("Failed to append trade log: %s", e)
+
+    def _ensure_reports_dir(self):
+        """Create the reports directory on first use only"""
+        if not self._reports_ready:
+            self._state_file.parent.mkdir(exist_ok=True)
+            self._reports_ready = True
+
+    def _mark_dirty(self):
+        """Schedule a state save, or save inline before initialize()"""
+        if self._dirty is not None:
+            self._dirty.set()
+        else:
+            self._save_state()
+
+    async def _persist_loop(self):
+        """Flush dirty state at most once per persist interval"""
+        while not self._persist_stop:
+            await self._dirty.wait()
+            if self._persist_stop:
+                break
+            # Let a burst of orders coalesce into one write
+            await asyncio.sleep(self._persist_delay)
+            self._dirty.clear()
+            state = self._snapshot_state()
+            await asyncio.to_thread(self._write_state, state)
+
+    def _snapshot_state(self) -> Dict[str, Any]:
+        """Copy persistable state on the event loop thread"""
+        return {
+            "balance": dict(self._balance),
+            "order_counter": self._order_counter,
+            "total_orders": self._total_orders,
+            "failed_orders": self._failed_orders,
+            "last_saved": datetime.now().isoformat(),
+        }
+
+    def _write_state(self, state: Dict[str, Any]):
+        """Write a state snapshot to disk"""
+        try:
+            self._ensure_reports_dir()
+            # Write aside then rename so a crash never leaves a torn file;
+            # the temp name is per writer so two writers never share it
+            tmp = self._state_file.with_name(
+                f"{self._state_file.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with self._state_lock:
+                tmp.write_bytes(fast_json.dumpb(state, indent=True))
+                os.replace(tmp, self._state_file)
         except Exception as e:
             self.logger.error(f"Failed to save dryrun state: {e}")
 
+    def _save_state(self):
+        """Persist portfolio state to disk synchronously"""
+        self._write_state(self._snapshot_state())
+
     def _load_state(self):
         """Load persisted portfolio state"""
         try:
             if self._state_file.exists():
-                with open(self._state_file, "r") as f:
-                    state = json.load(f)
+                state = fast_json.loads(self._state_file.read_bytes())
                 self._balance = state.get("balance", self._balance)
+                self._held = None
                 self._order_counter = state.get("order_counter", 0)
                 self.logger.info(
                     f"Loaded previous dryrun state: {state.get('last_saved')}"
@@ -302,12 +548,37 @@ class DryRunExchange(BaseExchange):
         except Exception as e:
             self.logger.warning(f"Could not load dryrun state: {e}")
 
-    def _save_trade_log(self):
-        """Save complete trade log for analysis"""
+    def _close_trade_log(self):
+        """Close the append-only trade log and gzip it into the archive"""
+        if self._trade_log_fh is None:
+            return
         try:
-            Path("reports").mkdir(exist_ok=True)
-            with open(self._trade_log_file, "w") as f:
-                json.dump(self._trade_log, f, indent=2)
-            self.logger.info(f"Trade log saved: {len(self._trade_log)} trades")
+            self._trade_log_fh.close()
+            self._archive_trade_log(self._trade_log_file)
+            self.logger.info(f"Trade log closed: {len(self._trade_log)} trades")
         except Exception as e:
-            self.logger.error(f"Failed to save trade log: {e}")
+            self.logger.error(f"Failed to close trade log: {e}")
+        finally:
+            self._trade_log_fh = None
+            self._unflushed_trades = 0
+
+    def _archive_trade_log(self, live: Path):
+        """Move a plain JSONL run log into its gzip archive as one member
+
+        Only this run's own (closed) log or the log of a run that has exited
+        is archived; a log still being written is never touched, so each
+        archive gets exactly one member.
+        """
+        if not live.exists():
+            return
+        if live != self._trade_log_file and _owner_alive(live):
+            return
+        with open(live, "rb") as src:
+            data = src.read()
+        # Drop a record torn by a crash so it can't merge with the next member
+        data = data[: data.rfind(b"\n") + 1]
+        if data:
+            with gzip.open(_archive_log_path(live), "ab") as dst:
+                dst.write(data)
+        live.unlink()
+        _owner_path(live).unlink(missing_ok=True)
@@ -4,19 +4,54 @@ Creates exchange instances for different cryptocurrency exchanges
 """
 
 import asyncio
+import importlib
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Tuple
 from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import numpy as np
 
 from src.utils.logger import get_logger
 
+_rng = np.random.default_rng()
+
+
+def _simulated_ohlcv(
+    base_price: float,
+    limit: int,
+    jitter: float,
+    bar_shape: Tuple[float, float, float],
+    volume_range: Tuple[float, float],
+    interval_ms: int = 300000,
+) -> list:
+    """Draw ``limit`` random candles around base_price in one batch.
+
+    bar_shape gives the open/high/low multipliers applied to each close.
+    """
+    now_ms = int(time.time() * 1000)
+    timestamps = now_ms - (limit - np.arange(limit)) * interval_ms
+    close = base_price + _rng.uniform(-jitter, jitter, limit) * base_price
+    volume = _rng.uniform(*volume_range, limit)
+    open_mult, high_mult, low_mult = bar_shape
+
+    prices = np.column_stack(
+        [close * open_mult, close * high_mult, close * low_mult, close, volume]
+    )
+    # Keep integer millisecond timestamps like the exchange API returns
+    return [list(row) for row in zip(timestamps.tolist(), *prices.T.tolist())]
+
 
 class BaseExchange(ABC):
     """Abstract base class for exchange implementations"""
 
+    # True when watch_ohlcv is backed by a live (WebSocket) stream
+    supports_ohlcv_stream = False
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.logger = get_logger(__name__)
+        self.logger = get_logger(type(self).__module__)
         self.sandbox = config.get("sandbox", True)
 
     @abstractmethod
@@ -53,6 +88,20 @@ class BaseExchange(ABC):
         """Get current positions"""
         pass
 
+    async def watch_ohlcv(self, symbol: str, timeframe: str) -> list:
+        """Wait for the next OHLCV update
+
+        Exchanges without a live stream (supports_ohlcv_stream False) fall
+        back to polling get_ohlcv every ``ohlcv_poll_interval`` seconds.
+        """
+        await asyncio.sleep(self.config.get("ohlcv_poll_interval", 5.0))
+        return await self.get_ohlcv(symbol, timeframe, limit=2)
+
+    async def get_tickers(self, symbols: List[str]) -> Dict[str, Any]:
+        """Get tickers for several symbols - default fetches them concurrently"""
+        tickers = await asyncio.gather(*(self.get_ticker(s) for s in symbols))
+        return dict(zip(symbols, tickers))
+
     async def get_balance(self) -> Dict[str, Any]:
         """Get account balance - default returns empty dict"""
         return {}
@@ -78,30 +127,10 @@ class BinanceExchangeStub(BaseExchange):
     async def get_ohlcv(self, symbol: str, timeframe: str, limit: int = 100) -> list:
         """Get OHLCV data from Binance"""
         # Simulated data - in production, use real API
-        import random
-        import time
-
         base_price = 50000 if "BTC" in symbol else 3000 if "ETH" in symbol else 100
-        ohlcv_data = []
-
-        import time
-
-        for i in range(limit):
-            timestamp = int(time.time() * 1000) - (limit - i) * 300000  # 5m intervals
-            price = base_price + random.uniform(-0.05, 0.05) * base_price
-
-            ohlcv_data.append(
-                [
-                    timestamp,
-                    price * 0.998,  # open
-                    price * 1.002,  # high
-                    price * 0.997,  # low
-                    price,  # close
-                    random.uniform(100, 10000),  # volume
-                ]
-            )
-
-        return ohlcv_data
+        return _simulated_ohlcv(
+            base_price, limit, 0.05, (0.998, 1.002, 0.997), (100, 10000)
+        )
 
     async def get_ticker(self, symbol: str) -> Dict[str, Any]:
         """Get current ticker price"""
@@ -136,8 +165,6 @@ class BinanceExchangeStub(BaseExchange):
     ) -> Dict[str, Any]:
         """Create market buy order"""
         # Simulated order
-        import time
-
         ticker = await self.get_ticker(symbol)
         price = ticker.get("last", 0)
         return {
@@ -155,8 +182,6 @@ class BinanceExchangeStub(BaseExchange):
     ) -> Dict[str, Any]:
         """Create market sell order"""
         # Simulated order
-        import time
-
         ticker = await self.get_ticker(symbol)
         price = ticker.get("last", 0)
         return {
@@ -195,28 +220,10 @@ class TrocadorExchange(BaseExchange):
     async def get_ohlcv(self, symbol: str, timeframe: str, limit: int = 100) -> list:
         """Get OHLCV data from Trocador"""
         # Simulated data - implement real Trocador API call
-        import random
-        import time
-
         base_price = 48000 if "BTC" in symbol else 2800 if "ETH" in symbol else 90
-        ohlcv_data = []
-
-        for i in range(limit):
-            timestamp = int(time.time() * 1000) - (limit - i) * 300000
-            price = base_price + random.uniform(-0.03, 0.03) * base_price
-
-            ohlcv_data.append(
-                [
-                    timestamp,
-                    price * 0.997,
-                    price * 1.003,
-                    price * 0.996,
-                    price,
-                    random.uniform(50, 5000),
-                ]
-            )
-
-        return ohlcv_data
+        return _simulated_ohlcv(
+            base_price, limit, 0.03, (0.997, 1.003, 0.996), (50, 5000)
+        )
 
     async def get_ticker(self, symbol: str) -> Dict[str, Any]:
         """Get current ticker price from Trocador"""
@@ -251,8 +258,6 @@ class TrocadorExchange(BaseExchange):
     ) -> Dict[str, Any]:
         """Create market buy order on Trocador"""
         # Simulated order - implement real API call
-        import time
-
         ticker = await self.get_ticker(symbol)
         price = ticker.get("last", 0)
         return {
@@ -271,8 +276,6 @@ class TrocadorExchange(BaseExchange):
     ) -> Dict[str, Any]:
         """Create market sell order on Trocador"""
         # Simulated order - implement real API call
-        import time
-
         ticker = await self.get_ticker(symbol)
         price = ticker.get("last", 0)
         return {
@@ -292,30 +295,42 @@ class TrocadorExchange(BaseExchange):
         return {}
 
 
+# Exchange name -> (module, class). Adapters living in other modules import
+# BaseExchange from here, so they are resolved lazily on first use.
+_EXCHANGES: Dict[str, Tuple[str, str]] = {
+    "binance": ("src.exchanges.binance_exchange", "BinanceExchange"),
+    "binance_stub": (__name__, "BinanceExchangeStub"),
+    "binance_dryrun": ("src.exchanges.dryrun_exchange", "DryRunExchange"),
+    "trocador": (__name__, "TrocadorExchange"),
+    "bybit": ("src.exchanges.bybit_exchange", "BybitTestnetExchange"),
+    "bybit_testnet": ("src.exchanges.bybit_exchange", "BybitTestnetExchange"),
+}
+
+
+@lru_cache(maxsize=None)
+def _exchange_class(name: str) -> type:
+    """Import and cache the adapter class registered under name"""
+    module_name, class_name = _EXCHANGES[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
 class ExchangeFactory:
     """Factory for creating exchange instances"""
 
     @staticmethod
-    def create_exchange(exchange_name: str, config: Dict[str, Any]) -> BaseExchange:
-        """Create exchange instance"""
-
-        from src.exchanges.binance_exchange import BinanceExchange
-        from src.exchanges.dryrun_exchange import DryRunExchange
-        from src.exchanges.bybit_exchange import BybitTestnetExchange
-
-        exchanges = {
-            "binance": BinanceExchange,
-            "binance_stub": BinanceExchangeStub,
-            "binance_dryrun": DryRunExchange,
-            "trocador": TrocadorExchange,
-            "bybit": BybitTestnetExchange,
-            "bybit_testnet": BybitTestnetExchange,
-        }
-
-        if exchange_name.lower() not in exchanges:
+    def create_exchange(
+        exchange_name: str, config: Dict[str, Any], **kwargs: Any
+    ) -> BaseExchange:
+        """Create exchange instance
+
+        Extra keyword arguments go to the adapter's constructor, e.g.
+        ``shared_exchange`` for binance_dryrun.
+        """
+        name = exchange_name.lower()
+        if name not in _EXCHANGES:
             raise ValueError(f"Unsupported exchange: {exchange_name}")
 
-        return exchanges[exchange_name.lower()](config)
+        return _exchange_class(name)(config, **kwargs)
 
 
 if __name__ == "__main__":
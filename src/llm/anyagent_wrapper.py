@@ -6,8 +6,11 @@ Provides multi-framework support and standardized tracing
 import os
 import asyncio
 import logging
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+
+from src.utils import fast_json
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +26,16 @@ except ImportError:
     )
 
 
+def _parse_json_object(text: str) -> Dict:
+    """Parse the JSON object in an LLM reply, ignoring any surrounding prose"""
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("no JSON object in response")
+    payload = text[start : end + 1]
+    return fast_json.loads(payload)
+
+
 @dataclass
 class VOLTAgentConfig:
     name: str
@@ -52,6 +65,8 @@ class AnyAgentWrapper:
         self.instructions = instructions or ""
         self.agent = None
         self.framework = config.framework
+        # Instructions only depend on immutable config, so build them once
+        self._built_instructions = self._build_instructions()
 
     async def initialize(self):
         """Initialize any-agent with configuration"""
@@ -69,7 +84,7 @@ class AnyAgentWrapper:
         agent_config = AgentConfig(
             name=self.config.name,
             model_id=self.config.model_id,
-            instructions=self._build_instructions(),
+            instructions=self._built_instructions,
             description=self.config.description,
             tools=self.tools,
         )
@@ -126,10 +141,8 @@ Respond with:
 
         # Parse JSON response
         try:
-            import json
-
-            return json.loads(result)
-        except:
+            return _parse_json_object(result)
+        except ValueError:
             return {"action": "HOLD", "confidence": 0, "reason": "parse_error"}
 
     async def evaluate_risk(self, trade_proposal: Dict) -> Dict:
@@ -153,10 +166,8 @@ Respond with:
         result = await self.think(prompt)
 
         try:
-            import json
-
-            return json.loads(result)
-        except:
+            return _parse_json_object(result)
+        except ValueError:
             return {"approved": False, "risk_score": 1.0, "reasons": ["parse_error"]}
 
 
@@ -189,16 +200,19 @@ AGENT_CONFIGS = {
 }
 
 
+@lru_cache(maxsize=32)
+def _agent_config(agent_type: str, framework: str) -> VOLTAgentConfig:
+    """Per-framework copy of a predefined agent config"""
+    return replace(AGENT_CONFIGS[agent_type], framework=framework)
+
+
 async def create_voltagent(agent_type: str, framework: str = "agno") -> AnyAgentWrapper:
     """Factory function to create VOLT agents"""
 
     if agent_type not in AGENT_CONFIGS:
         raise ValueError(f"Unknown agent type: {agent_type}")
 
-    config = AGENT_CONFIGS[agent_type]
-    config.framework = framework
-
-    agent = AnyAgentWrapper(config)
+    agent = AnyAgentWrapper(_agent_config(agent_type, framework))
     await agent.initialize()
 
     return agent
@@ -8,13 +8,68 @@ without changing the code, and provides automatic fallback when providers fail.
 
 import os
 import asyncio
+import hashlib
+import importlib
 import logging
-from typing import Any, Dict, List, Optional
+import math
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from types import MappingProxyType
+
+from src.utils import fast_json
 
 logger = logging.getLogger(__name__)
 
+try:
+    from any_llm import AnyLLM
+
+    ANY_LLM_AVAILABLE = True
+except ImportError:
+    AnyLLM = None
+    ANY_LLM_AVAILABLE = False
+    logger.warning("any-llm not installed. Install with: pip install any-llm-sdk")
+
+
+def _optional_exception(module: str, name: str):
+    try:
+        return getattr(importlib.import_module(module), name)
+    except (ImportError, AttributeError):
+        return None
+
+
+# Failures that mean "this provider is unavailable, try the next one"; they are
+# logged as a one-line warning. Anything else (TypeError, KeyError, ...) is not
+# propagated either: it is logged with its traceback at ERROR and then fails
+# over the same way, so complete() keeps its never-raises contract.
+_PROVIDER_ERRORS: Tuple[type, ...] = tuple(
+    exc
+    for exc in (
+        asyncio.TimeoutError,
+        OSError,  # connection refused/reset
+        ImportError,  # provider extra not installed
+        _optional_exception("any_llm.exceptions", "AnyLLMError"),
+        _optional_exception("httpx", "HTTPError"),
+        _optional_exception("openai", "OpenAIError"),
+        _optional_exception("anthropic", "AnthropicError"),
+        _optional_exception("ollama", "ResponseError"),
+        _optional_exception("ollama", "RequestError"),
+        _optional_exception("mistralai.models", "SDKError"),
+        _optional_exception("google.genai.errors", "APIError"),
+    )
+    if exc is not None
+)
+
+
+def _sampling_options(p_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Sampling kwargs to send; a temperature nobody set is left out"""
+    temperature = p_config.get("temperature")
+    return {} if temperature is None else {"temperature": temperature}
+
 
 class Provider(Enum):
     OLLAMA = "ollama"
@@ -38,6 +93,235 @@ class LLMConfig:
     timeout: int = 60
 
 
+class LLMCache:
+    """
+    Exact-match cache for deterministic (temperature 0) completions.
+    Entries expire after ``ttl`` seconds; least recently used entries are
+    evicted beyond ``maxsize``.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def cache_key(
+        provider: Optional[str],
+        model: Optional[str],
+        messages: List[Dict[str, str]],
+        temperature: float,
+    ) -> str:
+        payload = {
+            "provider": provider,
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+        }
+        return hashlib.sha256(fast_json.dumpb(payload, sort_keys=True)).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def set(self, key: str, value: Dict[str, Any]):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+# The structured "decision" field followed by a finished "confidence" value;
+# BUY/SELL/HOLD or numbers inside the reasoning text never match
+_DECISION_RE = re.compile(
+    r'"decision"\s*:\s*"(BUY|SELL|HOLD)"\s*,.*?'
+    r'"confidence"\s*:\s*(\d+(?:\.\d+)?)\s*[,}]',
+    re.DOTALL,
+)
+
+
+def decision_ready(text: str) -> bool:
+    """early_stop predicate for JSON replies that give decision and confidence
+    before the reasoning: true once both fields are complete"""
+    return _DECISION_RE.search(text) is not None
+
+
+def parse_decision(text: str) -> Optional[Dict[str, Any]]:
+    """Read decision and confidence from a reply cut off by decision_ready
+
+    An early-stopped reply is unterminated JSON, so it can't go through a
+    JSON parser; this extracts just the two fields the predicate matched.
+    """
+    match = _DECISION_RE.search(text)
+    if match is None:
+        return None
+    return {"decision": match.group(1), "confidence": float(match.group(2))}
+
+
+@lru_cache(maxsize=64)
+def _system_block(content: str) -> Dict[str, str]:
+    """Plain system message, shared by every request with the same prompt"""
+    return {"role": "system", "content": content}
+
+
+@lru_cache(maxsize=64)
+def _cached_system_block(content: str) -> Dict[str, Any]:
+    """System message marked for Anthropic prompt-prefix caching"""
+    return {
+        "role": "system",
+        "content": [
+            {"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}
+        ],
+    }
+
+
+def _with_prompt_cache(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Mark a leading plain-text system message as a cacheable prefix"""
+    if messages and messages[0].get("role") == "system":
+        content = messages[0].get("content")
+        if isinstance(content, str):
+            return [_cached_system_block(content), *messages[1:]]
+    return messages
+
+
+class SemanticLLMCache:
+    """
+    Template cache for prompts that differ only by small numeric changes.
+
+    Numbers in the messages are replaced by ``<NUM>`` slots to form a
+    template; a cached response is reused when the template matches and
+    every numeric slot is within ``rel_tol`` of the cached values. Symbols
+    and other text stay part of the template, so a hit never crosses pairs.
+    """
+
+    def __init__(
+        self,
+        rel_tol: float = 0.001,
+        ttl: float = 300.0,
+        maxsize: int = 1024,
+        per_template: int = 8,
+    ):
+        self.rel_tol = rel_tol
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.per_template = per_template
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def _split(messages: List[Dict[str, str]]) -> Tuple[str, Tuple[float, ...]]:
+        """Return (template, numeric slot values) for a message list"""
+        parts = []
+        values: List[float] = []
+        for message in messages:
+            content = message.get("content", "")
+            values.extend(float(n) for n in _NUMBER_RE.findall(content))
+            parts.append(f"{message.get('role')}:{_NUMBER_RE.sub('<NUM>', content)}")
+        return "\x1e".join(parts), tuple(values)
+
+    def _template_key(self, prefix: str, template: str) -> str:
+        return hashlib.sha256(f"{prefix}\x1f{template}".encode()).hexdigest()
+
+    def get(
+        self, prefix: str, messages: List[Dict[str, str]]
+    ) -> Optional[Dict[str, Any]]:
+        template, values = self._split(messages)
+        bucket = self._entries.get(self._template_key(prefix, template))
+        if bucket:
+            now = time.monotonic()
+            bucket[:] = [entry for entry in bucket if entry[0] >= now]
+            for _, cached_values, response in bucket:
+                if len(cached_values) == len(values) and all(
+                    math.isclose(a, b, rel_tol=self.rel_tol)
+                    for a, b in zip(values, cached_values)
+                ):
+                    self.stats["hits"] += 1
+                    return response
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, prefix: str, messages: List[Dict[str, str]], value: Dict[str, Any]):
+        template, values = self._split(messages)
+        key = self._template_key(prefix, template)
+        bucket = self._entries.setdefault(key, [])
+        bucket.append((time.monotonic() + self.ttl, values, value))
+        del bucket[: -self.per_template]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+# Default models for each provider
+_DEFAULT_MODELS = MappingProxyType(
+    {
+        Provider.OLLAMA: "gemma3:4b",
+        Provider.OPENAI: "gpt-4o-mini",
+        Provider.ANTHROPIC: "claude-3-haiku-20240307",
+        Provider.MISTRAL: "mistral-small-latest",
+        Provider.GOOGLE: "gemini-2.0-flash",
+    }
+)
+
+# Fallback chain - when one fails, try the next
+_FALLBACK_CHAIN = (
+    Provider.OLLAMA,  # Local first (cheapest)
+    Provider.OPENAI,  # Then OpenAI (fast)
+    Provider.MISTRAL,  # Then Mistral (balanced)
+    Provider.ANTHROPIC,  # Then Anthropic (quality)
+)
+
+# Approximate pricing (USD per 1M tokens)
+_PRICING = MappingProxyType(
+    {
+        Provider.OPENAI: MappingProxyType(
+            {
+                "gpt-4o": 2.50,
+                "gpt-4o-mini": 0.15,
+                "gpt-4": 30.00,
+                "gpt-3.5-turbo": 0.50,
+            }
+        ),
+        Provider.ANTHROPIC: MappingProxyType(
+            {
+                "claude-3-opus": 15.00,
+                "claude-3-sonnet": 3.00,
+                "claude-3-haiku": 0.25,
+            }
+        ),
+        Provider.MISTRAL: MappingProxyType(
+            {
+                "mistral-large": 2.00,
+                "mistral-small": 0.20,
+            }
+        ),
+        Provider.GOOGLE: MappingProxyType(
+            {
+                "gemini-2.0-flash": 0.0,  # Free tier
+            }
+        ),
+    }
+)
+
+# Providers billed at one rate regardless of model
+_FLAT_RATES = MappingProxyType(
+    {
+        Provider.OLLAMA: 0.0,  # Local, free
+        Provider.LOCAL: 0.0,
+    }
+)
+
+_EMPTY = MappingProxyType({})
+
+
 class AnyLLMAdapter:
     """
     Adapter that provides a unified interface to multiple LLM providers
@@ -50,22 +334,8 @@ class AnyLLMAdapter:
     - Cost and performance tracking
     """
 
-    # Default models for each provider
-    DEFAULT_MODELS = {
-        Provider.OLLAMA: "gemma3:4b",
-        Provider.OPENAI: "gpt-4o-mini",
-        Provider.ANTHROPIC: "claude-3-haiku-20240307",
-        Provider.MISTRAL: "mistral-small-latest",
-        Provider.GOOGLE: "gemini-2.0-flash",
-    }
-
-    # Fallback chain - when one fails, try the next
-    FALLBACK_CHAIN = [
-        Provider.OLLAMA,  # Local first (cheapest)
-        Provider.OPENAI,  # Then OpenAI (fast)
-        Provider.MISTRAL,  # Then Mistral (balanced)
-        Provider.ANTHROPIC,  # Then Anthropic (quality)
-    ]
+    DEFAULT_MODELS = _DEFAULT_MODELS
+    FALLBACK_CHAIN = _FALLBACK_CHAIN
 
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.logger = logging.getLogger(__name__)
@@ -73,6 +343,42 @@ class AnyLLMAdapter:
         self.current_provider = None
         self.current_model = None
         self.client = None
+        # One long-lived client per provider so its HTTP pool stays warm
+        self._clients: Dict[Provider, Any] = {}
+        self.cache = LLMCache(
+            maxsize=self.config.get("cache_size", 4096),
+            ttl=self.config.get("cache_ttl", 3600.0),
+        )
+        semantic = self.config.get("semantic_cache", {})
+        self.semantic_cache = (
+            SemanticLLMCache(
+                rel_tol=semantic.get("rel_tol", 0.001),
+                ttl=semantic.get("ttl", 300.0),
+            )
+            if semantic.get("enabled", False)
+            else None
+        )
+        # Cap in-flight requests per provider (config <provider>.max_concurrency)
+        self._sem = {
+            p: asyncio.Semaphore(
+                self.config.get(p.value, {}).get(
+                    "max_concurrency", 4 if p == Provider.OLLAMA else 8
+                )
+            )
+            for p in Provider
+        }
+        # Per-provider circuit breaker: after `breaker_threshold` failures in
+        # `breaker_window` seconds a provider is skipped for `breaker_cooldown`
+        # seconds, then a single probe request is let through (half-open)
+        self._breaker_threshold = self.config.get("breaker_threshold", 3)
+        self._breaker_window = self.config.get("breaker_window", 60.0)
+        self._breaker_cooldown = self.config.get("breaker_cooldown", 30.0)
+        self._breaker: Dict[Provider, Dict[str, float]] = {
+            p: {"fails": 0, "first_fail": 0.0, "open_until": 0.0, "probe_at": 0.0}
+            for p in Provider
+        }
+        # Identical concurrent requests share one call (single-flight)
+        self._inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
         self._init_providers()
 
     def _init_providers(self):
@@ -95,21 +401,37 @@ class AnyLLMAdapter:
         if os.environ.get("GOOGLE_API_KEY"):
             self.available_providers.append(Provider.GOOGLE)
 
+        # Provider settings are fixed for the process lifetime; resolve the
+        # config and environment lookups once instead of per request
+        self._provider_configs = {p: self._get_provider_config(p) for p in Provider}
+
         self.logger.info(
             f"Available providers: {[p.value for p in self.available_providers]}"
         )
 
+        # Warm remote provider clients in the background when a loop is running
+        self._prewarm_task = None
+        if self.config.get("prewarm", True):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self._prewarm_task = loop.create_task(self.prewarm())
+
     def _get_provider_config(self, provider: Provider) -> Dict[str, Any]:
         """Get configuration for a specific provider"""
 
         config = self.config.get(provider.value, {})
 
         base_config = {
-            "model": config.get("model", self.DEFAULT_MODELS.get(provider, "default")),
-            "temperature": config.get("temperature", 0.6),
+            "model": config.get("model", _DEFAULT_MODELS.get(provider, "default")),
             "max_tokens": config.get("max_tokens", 2048),
             "timeout": config.get("timeout", 60),
         }
+        # Only forwarded when configured; otherwise the provider default applies
+        if "temperature" in config:
+            base_config["temperature"] = config["temperature"]
 
         # Add provider-specific settings
         if provider == Provider.OLLAMA:
@@ -139,6 +461,99 @@ class AnyLLMAdapter:
 
         return base_config
 
+    def _get_client(self, provider: Provider, p_config: Dict[str, Any]):
+        """Return the cached any-llm client for a provider, creating it once"""
+        client = self._clients.get(provider)
+        if client is None:
+            if AnyLLM is None:
+                raise ImportError("any-llm not installed")
+            client = AnyLLM.create(
+                p_config.get("provider", provider.value),
+                api_key=p_config.get("api_key"),
+                api_base=p_config.get("api_base"),
+            )
+            self._clients[provider] = client
+        return client
+
+    async def aclose(self):
+        """Release pooled provider clients"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            close = getattr(client, "aclose", None) or getattr(client, "close", None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.logger.debug(f"Error closing LLM client: {e}")
+
+    async def prewarm(self, timeout: float = 2.0):
+        """Open a pooled connection to each remote provider ahead of use.
+
+        Creates the provider clients and lists their models, which is free
+        and leaves a TLS connection in the async client's pool. Clients
+        without ``alist_models`` are only constructed. Failures are ignored.
+        """
+        remote = [p for p in self.available_providers if p != Provider.OLLAMA]
+
+        async def _warm(p: Provider):
+            try:
+                client = self._get_client(p, self._provider_configs[p])
+                list_models = getattr(client, "alist_models", None)
+                if list_models is not None:
+                    await asyncio.wait_for(list_models(), timeout)
+            except Exception as e:
+                self.logger.debug("Prewarm of %s failed: %s", p.value, e)
+
+        await asyncio.gather(*(_warm(p) for p in remote))
+
+    def _breaker_allows(self, provider: Provider) -> bool:
+        """Whether a request may be sent to provider right now"""
+        state = self._breaker[provider]
+        if not state["open_until"]:
+            return True
+        now = time.monotonic()
+        if now < state["open_until"]:
+            return False
+        # Half-open: one probe per cooldown period
+        if now - state["probe_at"] < self._breaker_cooldown:
+            return False
+        state["probe_at"] = now
+        return True
+
+    def _record_success(self, provider: Provider):
+        state = self._breaker[provider]
+        state["fails"] = 0
+        state["open_until"] = 0.0
+        state["probe_at"] = 0.0
+
+    def _record_failure(self, provider: Provider):
+        state = self._breaker[provider]
+        now = time.monotonic()
+        if state["open_until"]:
+            # Failed probe - stay open for another cooldown
+            state["open_until"] = now + self._breaker_cooldown
+            return
+        if now - state["first_fail"] > self._breaker_window:
+            state["fails"] = 0
+            state["first_fail"] = now
+        state["fails"] += 1
+        if state["fails"] >= self._breaker_threshold:
+            state["open_until"] = now + self._breaker_cooldown
+            self.logger.warning(
+                "Circuit opened for %s for %.0fs",
+                provider.value,
+                self._breaker_cooldown,
+            )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
     async def complete(
         self,
         messages: List[Dict[str, str]],
@@ -160,8 +575,6 @@ class AnyLLMAdapter:
         Returns:
             {"content": "...", "provider": "...", "model": "..."}
         """
-        from any_llm import completion, acompletion
-
         # Determine which providers to try
         if provider:
             providers_to_try = [provider]
@@ -172,29 +585,99 @@ class AnyLLMAdapter:
                 [self.available_providers[0]] if self.available_providers else []
             )
 
+        # Deterministic requests are answered from the exact-match cache
+        cache_key = None
+        semantic_prefix = None
+        temperature = kwargs.get("temperature")
+        if temperature is not None and temperature <= 1e-6:
+            cache_key = self.cache.cache_key(
+                provider.value if provider else None, model, messages, temperature
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            if self.semantic_cache is not None:
+                semantic_prefix = f"{provider.value if provider else ''}:{model}"
+                cached = self.semantic_cache.get(semantic_prefix, messages)
+                if cached is not None:
+                    return cached
+
+        # Coalesce identical in-flight requests into a single call. Extra
+        # kwargs aren't part of the key, so only plain requests are shared.
+        if set(kwargs) - {"temperature"}:
+            return await self._dispatch(
+                providers_to_try, messages, model, kwargs, cache_key, semantic_prefix
+            )
+        flight_key = "%s:%s" % (
+            fallback,
+            cache_key
+            or self.cache.cache_key(
+                provider.value if provider else None, model, messages, temperature
+            ),
+        )
+        task = self._inflight.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._dispatch(
+                    providers_to_try,
+                    messages,
+                    model,
+                    kwargs,
+                    cache_key,
+                    semantic_prefix,
+                )
+            )
+            self._inflight[flight_key] = task
+
+            def _release(done):
+                if self._inflight.get(flight_key) is done:
+                    del self._inflight[flight_key]
+
+            task.add_done_callback(_release)
+        # Shielded so one caller's cancellation doesn't cancel the others
+        return await asyncio.shield(task)
+
+    async def _dispatch(
+        self,
+        providers_to_try: List[Provider],
+        messages: List[Dict[str, str]],
+        model: Optional[str],
+        kwargs: Dict[str, Any],
+        cache_key: Optional[str],
+        semantic_prefix: Optional[str],
+    ) -> Dict[str, Any]:
+        """Try providers in order; store the result in the caches when keyed"""
         last_error = None
 
         for p in providers_to_try:
+            if not self._breaker_allows(p):
+                self.logger.debug("Skipping %s: circuit open", p.value)
+                last_error = last_error or RuntimeError(f"{p.value} circuit open")
+                continue
             try:
-                p_config = self._get_provider_config(p)
+                # Merge additional kwargs over the resolved provider config
+                p_config = {**self._provider_configs[p], **kwargs}
 
                 # Override model if specified
                 if model:
                     p_config["model"] = model
 
-                # Merge additional kwargs
-                p_config.update(kwargs)
-
                 # Make the request
                 self.logger.info(
-                    f"Calling {p.value} with model {p_config.get('model')}"
+                    "Calling %s with model %s", p.value, p_config.get("model")
                 )
 
-                response = await acompletion(
-                    model=p_config.get("model"),
-                    provider=p_config.get("provider"),
-                    messages=messages,
-                )
+                client = self._get_client(p, p_config)
+                async with self._sem[p]:
+                    response = await client.acompletion(
+                        model=p_config.get("model"),
+                        messages=(
+                            _with_prompt_cache(messages)
+                            if p is Provider.ANTHROPIC
+                            else messages
+                        ),
+                        **_sampling_options(p_config),
+                    )
 
                 # Extract content
                 content = (
@@ -203,24 +686,42 @@ class AnyLLMAdapter:
 
                 self.current_provider = p
                 self.current_model = p_config.get("model")
+                self._record_success(p)
 
-                self.logger.info(f"✅ {p.value} call successful")
+                self.logger.info("✅ %s call successful", p.value)
 
-                return {
+                result = {
                     "content": content,
                     "provider": p.value,
                     "model": self.current_model,
                     "raw_response": response,
                 }
-
+                if cache_key is not None:
+                    self.cache.set(cache_key, result)
+                    if self.semantic_cache is not None:
+                        self.semantic_cache.set(semantic_prefix, messages, result)
+                return result
+
+            except _PROVIDER_ERRORS as e:
+                self.logger.warning(
+                    "⚠️ %s failed: %.100s",
+                    p.value,
+                    e,
+                    exc_info=self.logger.isEnabledFor(logging.DEBUG),
+                )
+                self._record_failure(p)
+                last_error = e
+                continue
             except Exception as e:
-                self.logger.warning(f"⚠️ {p.value} failed: {str(e)[:100]}")
+                # Not a provider outage, but still failed over, not raised
+                self.logger.error("❌ %s raised unexpectedly", p.value, exc_info=True)
+                self._record_failure(p)
                 last_error = e
                 continue
 
         # All providers failed
         error_msg = f"All providers failed. Last error: {last_error}"
-        self.logger.error(f"❌ {error_msg}")
+        self.logger.error("❌ %s", error_msg)
 
         return {
             "content": f"ERROR: {error_msg}",
@@ -229,6 +730,112 @@ class AnyLLMAdapter:
             "error": str(last_error),
         }
 
+    async def complete_streaming(
+        self,
+        messages: List[Dict[str, str]],
+        early_stop: Optional[Callable[[str], bool]] = None,
+        preferred_provider: Optional[Provider] = None,
+        model: Optional[str] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Stream a completion, stopping as soon as early_stop(text) is True
+
+        Short structured answers (a decision plus a confidence) usually
+        arrive in the first few tokens, so the rest of the generation can be
+        skipped. Falls back across providers like complete_with_fallback.
+
+        Returns:
+            {"content": "...", "provider": "...", "model": "...", "stopped_early": bool}
+        """
+        providers = list(self.available_providers)
+        if preferred_provider in providers:
+            providers.remove(preferred_provider)
+            providers.insert(0, preferred_provider)
+
+        last_error = None
+
+        for p in providers:
+            if not self._breaker_allows(p):
+                self.logger.debug("Skipping %s: circuit open", p.value)
+                last_error = last_error or RuntimeError(f"{p.value} circuit open")
+                continue
+            try:
+                p_config = {**self._provider_configs[p], **kwargs}
+                if model:
+                    p_config["model"] = model
+
+                self.logger.info(
+                    "Streaming %s with model %s", p.value, p_config.get("model")
+                )
+
+                client = self._get_client(p, p_config)
+                parts: List[str] = []
+                stopped_early = False
+                async with self._sem[p]:
+                    stream = await client.acompletion(
+                        model=p_config.get("model"),
+                        messages=(
+                            _with_prompt_cache(messages)
+                            if p is Provider.ANTHROPIC
+                            else messages
+                        ),
+                        stream=True,
+                        **_sampling_options(p_config),
+                    )
+                    try:
+                        async for chunk in stream:
+                            if not chunk.choices:
+                                continue
+                            delta = chunk.choices[0].delta.content
+                            if not delta:
+                                continue
+                            parts.append(delta)
+                            if early_stop is not None and early_stop("".join(parts)):
+                                stopped_early = True
+                                break
+                    finally:
+                        aclose = getattr(stream, "aclose", None)
+                        if aclose is not None:
+                            await aclose()
+
+                self.current_provider = p
+                self.current_model = p_config.get("model")
+                self._record_success(p)
+
+                return {
+                    "content": "".join(parts),
+                    "provider": p.value,
+                    "model": self.current_model,
+                    "stopped_early": stopped_early,
+                }
+
+            except _PROVIDER_ERRORS as e:
+                self.logger.warning(
+                    "⚠️ %s stream failed: %.100s",
+                    p.value,
+                    e,
+                    exc_info=self.logger.isEnabledFor(logging.DEBUG),
+                )
+                self._record_failure(p)
+                last_error = e
+                continue
+            except Exception as e:
+                # Not a provider outage, but still failed over, not raised
+                self.logger.error(
+                    "❌ %s stream raised unexpectedly", p.value, exc_info=True
+                )
+                self._record_failure(p)
+                last_error = e
+                continue
+
+        return {
+            "content": f"ERROR: All providers exhausted. Last error: {last_error}",
+            "provider": "none",
+            "model": "none",
+            "error": str(last_error),
+        }
+
     async def complete_with_fallback(
         self,
         messages: List[Dict[str, str]],
@@ -260,7 +867,7 @@ class AnyLLMAdapter:
                     return result
 
             except Exception as e:
-                self.logger.warning(f"⚠️ {provider.value} failed, trying next...")
+                self.logger.warning("⚠️ %s failed, trying next...", provider.value)
                 last_error = e
                 continue
 
@@ -274,9 +881,7 @@ class AnyLLMAdapter:
     def get_available_models(self, provider: Provider) -> List[str]:
         """Get available models for a provider"""
         try:
-            from any_llm import AnyLLM
-
-            client = AnyLLM.create(provider.value)
+            client = self._get_client(provider, self._provider_configs[provider])
             models = client.list_models()
             return [m.id for m in models]
         except Exception as e:
@@ -286,31 +891,10 @@ class AnyLLMAdapter:
     def estimate_cost(self, provider: Provider, model: str, tokens: int) -> float:
         """Estimate cost for a request (in USD)"""
 
-        # Approximate pricing (per 1M tokens)
-        pricing = {
-            Provider.OPENAI: {
-                "gpt-4o": 2.50,
-                "gpt-4o-mini": 0.15,
-                "gpt-4": 30.00,
-                "gpt-3.5-turbo": 0.50,
-            },
-            Provider.ANTHROPIC: {
-                "claude-3-opus": 15.00,
-                "claude-3-sonnet": 3.00,
-                "claude-3-haiku": 0.25,
-            },
-            Provider.MISTRAL: {
-                "mistral-large": 2.00,
-                "mistral-small": 0.20,
-            },
-            Provider.OLLAMA: 0.0,  # Local, free
-            Provider.GOOGLE: {
-                "gemini-2.0-flash": 0.0,  # Free tier
-            },
-        }
-
-        provider_pricing = pricing.get(provider, {})
-        rate = provider_pricing.get(model, 1.0)  # Default to $1/M if unknown
+        rate = _FLAT_RATES.get(provider)
+        if rate is None:
+            # Default to $1/M if unknown
+            rate = _PRICING.get(provider, _EMPTY).get(model, 1.0)
 
         return (tokens / 1_000_000) * rate
 
@@ -326,6 +910,7 @@ class MultiProviderAgent:
         agent_id: str,
         config: Optional[Dict[str, Any]] = None,
         preferred_provider: Provider = Provider.OLLAMA,
+        system_prompt: Optional[str] = None,
     ):
         self.agent_id = agent_id
         self.config = config or {}
@@ -333,19 +918,46 @@ class MultiProviderAgent:
         self.llm_adapter = AnyLLMAdapter(config)
         self.logger = logging.getLogger(f"{__name__}.{agent_id}")
 
-    async def think(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Generate thought using the best available provider"""
+        # System messages are built once and reused verbatim so every request
+        # shares a byte-identical prefix that providers can serve from cache
+        self._system_msg = (
+            {"role": "system", "content": system_prompt} if system_prompt else None
+        )
+
+    def _system_message(self, system_prompt: Optional[str]) -> Optional[Dict[str, str]]:
+        if not system_prompt:
+            return self._system_msg
+        return _system_block(system_prompt)
 
-        messages = []
+    async def think(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        early_stop: Optional[Callable[[str], bool]] = None,
+    ) -> str:
+        """
+        Generate thought using the best available provider
 
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
+        Pass early_stop (e.g. decision_ready) when only a short structured
+        answer is needed; the response is then streamed and cut off as soon
+        as the predicate matches. A cut-off reply is not valid JSON - read it
+        with parse_decision().
+        """
 
-        messages.append({"role": "user", "content": prompt})
+        system_msg = self._system_message(system_prompt)
+        user_msg = {"role": "user", "content": prompt}
+        messages = [system_msg, user_msg] if system_msg else [user_msg]
 
-        result = await self.llm_adapter.complete_with_fallback(
-            messages=messages, preferred_provider=self.preferred_provider
-        )
+        if early_stop is not None:
+            result = await self.llm_adapter.complete_streaming(
+                messages=messages,
+                early_stop=early_stop,
+                preferred_provider=self.preferred_provider,
+            )
+        else:
+            result = await self.llm_adapter.complete_with_fallback(
+                messages=messages, preferred_provider=self.preferred_provider
+            )
 
         content = result.get("content", "")
 
@@ -356,19 +968,23 @@ class MultiProviderAgent:
         return content
 
     async def think_with_context(
-        self, prompt: str, context: Dict[str, Any], system_prompt: Optional[str] = None
+        self,
+        prompt: str,
+        context: Dict[str, Any],
+        system_prompt: Optional[str] = None,
+        early_stop: Optional[Callable[[str], bool]] = None,
     ) -> str:
         """Generate thought with additional context"""
 
-        # Build context string
-        context_str = "\n".join([f"{k}: {v}" for k, v in context.items()])
+        # Serialize the context once as a JSON block
+        context_str = fast_json.dumps(context, default=str)
 
         full_prompt = f"""Context:
 {context_str}
 
 Question: {prompt}"""
 
-        return await self.think(full_prompt, system_prompt)
+        return await self.think(full_prompt, system_prompt, early_stop)
 
 
 # Convenience function for VOLT
@@ -5,5 +5,6 @@ Multi-agent system with weighted consensus
 
 from src.ollama_agents.base_agent import BaseAgent
 from src.ollama_agents.agent_network import AgentNetwork
+from src.ollama_agents.agent_pool import AgentPool
 
-__all__ = ['BaseAgent', 'AgentNetwork']
+__all__ = ['BaseAgent', 'AgentNetwork', 'AgentPool']
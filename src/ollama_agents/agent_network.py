@@ -4,8 +4,18 @@ Implements weighted voting and consensus building
 """
 
 import asyncio
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
 
 from src.ollama_agents.specialized_agents import (
     StrategyAgent,
@@ -16,6 +26,58 @@ from src.ollama_agents.specialized_agents import (
 )
 from src.utils.logger import get_logger
 
+# Score vector layout shared by all votes
+DECISIONS = ("BUY", "SELL", "HOLD")
+DECISION_IDX = {"BUY": 0, "SELL": 1, "HOLD": 2}
+SENTIMENT_IDX = {"BULLISH": 0, "BEARISH": 1, "NEUTRAL": 2}
+HOLD_IDX = DECISION_IDX["HOLD"]
+
+# uint8 codes for consensus_type in the Parquet decision log
+CONSENSUS_TYPES = tuple(
+    f"{strength}{decision}"
+    for strength in ("STRONG_", "", "WEAK_")
+    for decision in DECISIONS
+)
+CONSENSUS_TYPE_IDX = {name: i for i, name in enumerate(CONSENSUS_TYPES)}
+
+# Layout of the cached agent weight vector
+AGENT_NAMES = ("strategy", "risk", "market", "execution", "auditor")
+_WEIGHT_IDX = {name: i for i, name in enumerate(AGENT_NAMES)}
+_W_STRATEGY = _WEIGHT_IDX["strategy"]
+_W_RISK = _WEIGHT_IDX["risk"]
+_W_MARKET = _WEIGHT_IDX["market"]
+
+# Where the risk vote lands, indexed [approved][strategy_idx]: rejection backs
+# HOLD, approval backs the BUY/SELL proposal. An approved HOLD adds nothing, so
+# it goes to a spare slot past the end of the score vector.
+_DISCARD_IDX = len(DECISIONS)
+_RISK_TARGET = (
+    (HOLD_IDX, HOLD_IDX, HOLD_IDX),
+    (DECISION_IDX["BUY"], DECISION_IDX["SELL"], _DISCARD_IDX),
+)
+_RISK_TARGET_ARRAY = np.array(_RISK_TARGET)
+
+
+def _label_table(index: Dict[str, int]):
+    """Sorted labels and their codes for np.searchsorted encoding"""
+    labels = sorted(index)
+    return np.array(labels), np.array([index[label] for label in labels])
+
+
+_DECISION_TABLE = _label_table(DECISION_IDX)
+_SENTIMENT_TABLE = _label_table(SENTIMENT_IDX)
+
+
+def _encode_labels(labels, table) -> np.ndarray:
+    """Map label strings to score indices; unknown labels map to HOLD.
+    Integer input is taken as already-encoded indices."""
+    labels = np.asarray(labels)
+    if labels.dtype.kind in "iu":
+        return labels.astype(np.intp)
+    keys, codes = table
+    pos = np.minimum(np.searchsorted(keys, labels), len(keys) - 1)
+    return np.where(keys[pos] == labels, codes[pos], HOLD_IDX)
+
 
 class AgentNetwork:
     """
@@ -23,15 +85,37 @@ class AgentNetwork:
     Implements weighted voting for consensus decisions
     """
     
-    def __init__(self):
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.logger = get_logger(__name__)
+        self.config = config or {}
+        
+        # Quiet-bar fast path: a confident HOLD on a NEUTRAL market skips the
+        # risk, execution and auditor agents (off unless enabled)
+        self.hold_fast_path = self.config.get("hold_fast_path", False)
+        self.hold_fast_path_confidence = self.config.get(
+            "hold_fast_path_confidence", 0.7
+        )
         
         # Initialize all agents
         self.agents = {}
         self._initialize_agents()
         
-        # Decision history
-        self.decision_history = []
+        # Decision history (bounded; timestamps are epoch nanoseconds)
+        self.decision_history = deque(maxlen=10_000)
+        
+        # Optional columnar decision log: rows are buffered and appended to a
+        # Parquet dataset every decision_log_flush_every decisions and on close()
+        self.decision_log_dir = self.config.get("decision_log_dir")
+        self.decision_log_flush_every = self.config.get(
+            "decision_log_flush_every", 500
+        )
+        self._pending_decisions: List[tuple] = []
+        if self.decision_log_dir and pa is None:
+            self.logger.warning(
+                "decision_log_dir set but pyarrow is not installed; "
+                "decisions will not be persisted"
+            )
+            self.decision_log_dir = None
         
         self.logger.info("🤖 Agent Network initialized with 5 agents")
     
@@ -44,6 +128,13 @@ class AgentNetwork:
             "execution": ExecutionAgent(),
             "auditor": AuditorAgent()
         }
+        self._refresh_weights()
+    
+    def _refresh_weights(self):
+        """Snapshot agent weights into the vector used by consensus scoring"""
+        self._weight_vec = np.array(
+            [self.agents[name].weight for name in AGENT_NAMES], dtype=np.float64
+        )
     
     async def propose_trade(
         self, 
@@ -74,92 +165,310 @@ class AgentNetwork:
                 "consensus_type": "STRONG_BUY"|"BUY"|"HOLD"|...
             }
         """
-        self.logger.info(f"🤖 Starting multi-agent analysis for {market_data.get('symbol', 'N/A')}")
+        self.logger.info(
+            "🤖 Starting multi-agent analysis for %s", market_data.get("symbol", "N/A")
+        )
         
         try:
-            # Step 1: Strategy agent proposes
-            strategy_result = await self.agents["strategy"].analyze(market_data)
+            # Steps 1+2: Strategy proposal and market context are independent
+            strategy_result, market_result = await self._gather_agents(
+                self.agents["strategy"].analyze(market_data),
+                self.agents["market"].analyze(market_data),
+            )
             self.logger.info(
-                f"   Strategy: {strategy_result['decision']} "
-                f"(confidence: {strategy_result['confidence']:.0%})"
+                "   Strategy: %s (confidence: %.0f%%)",
+                strategy_result["decision"],
+                strategy_result["confidence"] * 100,
             )
-            
-            # Step 2: Market agent provides context
-            market_result = await self.agents["market"].analyze(market_data)
             self.logger.info(
-                f"   Market: {market_result.get('sentiment', 'NEUTRAL')}"
+                "   Market: %s", market_result.get("sentiment", "NEUTRAL")
             )
             
+            if self._is_quiet_hold(strategy_result, market_result):
+                return self._quiet_hold(market_data, strategy_result, market_result)
+            
             # Step 3: Risk agent reviews proposal
-            risk_context = {
-                "proposal": strategy_result,
-                "portfolio": portfolio,
-                "correlation": market_data.get("correlation", 0.0),
-                "max_position_size": market_data.get("max_position_size", 0.10)
-            }
-            risk_result = await self.agents["risk"].analyze(risk_context)
+            risk_result = await self.agents["risk"].analyze(
+                self._risk_context(market_data, portfolio, strategy_result)
+            )
             
             approved = risk_result.get("approved", False)
-            self.logger.info(
-                f"   Risk: {'APPROVED' if approved else 'REJECTED'}"
-            )
+            self.logger.info("   Risk: %s", "APPROVED" if approved else "REJECTED")
             
             # If risk rejects, override to HOLD
             if not approved:
-                return {
-                    "decision": "HOLD",
-                    "confidence": 0.0,
-                    "agent_votes": {
-                        "strategy": strategy_result,
-                        "market": market_result,
-                        "risk": risk_result
-                    },
-                    "reasoning": f"Risk rejected: {risk_result.get('reasoning', 'Unknown')}",
-                    "consensus_type": "REJECTED_BY_RISK"
-                }
-            
-            # Step 4: Execution optimization
-            exec_result = await self.agents["execution"].analyze({
-                "recommended_size": market_data.get("position_size", 0.05)
-            })
+                return self._risk_rejection(strategy_result, market_result, risk_result)
             
-            # Step 5: Auditor check
-            audit_result = await self.agents["auditor"].analyze({
-                "agent_decisions": [strategy_result, market_result, risk_result]
-            })
+            # Steps 4+5: Execution optimization and auditor check in parallel
+            exec_result, audit_result = await self._gather_agents(
+                *self._review_calls(
+                    market_data, strategy_result, market_result, risk_result
+                )
+            )
             
             # Step 6: Calculate weighted consensus
-            consensus = self._calculate_weighted_consensus({
-                "strategy": strategy_result,
-                "market": market_result,
-                "risk": risk_result,
-                "execution": exec_result,
-                "auditor": audit_result
-            })
-            
-            self.logger.info(
-                f"   Consensus: {consensus['consensus_type']} "
-                f"(confidence: {consensus['confidence']:.0%})"
+            return self._finalize_consensus(
+                market_data,
+                strategy_result,
+                market_result,
+                risk_result,
+                exec_result,
+                audit_result,
             )
             
-            # Store decision
-            self.decision_history.append({
-                "timestamp": datetime.now(),
-                "symbol": market_data.get("symbol"),
-                "consensus": consensus
-            })
-            
-            return consensus
-            
         except Exception as e:
-            self.logger.error(f"❌ Agent network error: {e}")
-            return {
-                "decision": "HOLD",
-                "confidence": 0.0,
-                "agent_votes": {},
-                "reasoning": f"Error: {e}",
-                "consensus_type": "ERROR"
+            self.logger.error("❌ Agent network error: %s", e)
+            return self._error_result(e)
+    
+    async def propose_trades_batch(
+        self, inputs: List[Tuple[Dict[str, Any], Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the propose_trade pipeline for many symbols at once
+        
+        Each stage fans out across all symbols in one gather, so N symbols
+        cost about one pipeline's latency instead of N. A failure in any
+        stage turns only that symbol's result into an ERROR/HOLD.
+        
+        Args:
+            inputs: [(market_data, portfolio), ...]
+            
+        Returns:
+            One propose_trade-style result per input, in order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(inputs)
+        
+        # Steps 1+2 for every symbol
+        first = await asyncio.gather(
+            *(self.agents["strategy"].analyze(md) for md, _ in inputs),
+            *(self.agents["market"].analyze(md) for md, _ in inputs),
+            return_exceptions=True,
+        )
+        strategies, markets = first[: len(inputs)], first[len(inputs) :]
+        
+        pending = []
+        for i, (strategy_result, market_result) in enumerate(zip(strategies, markets)):
+            error = self._first_error(strategy_result, market_result)
+            if error is not None:
+                results[i] = self._error_result(error)
+            elif self._is_quiet_hold(strategy_result, market_result):
+                results[i] = self._quiet_hold(
+                    inputs[i][0], strategy_result, market_result
+                )
+            else:
+                pending.append(i)
+        
+        # Step 3 for every surviving symbol
+        risks = await asyncio.gather(
+            *(
+                self.agents["risk"].analyze(
+                    self._risk_context(inputs[i][0], inputs[i][1], strategies[i])
+                )
+                for i in pending
+            ),
+            return_exceptions=True,
+        )
+        
+        approved = []
+        risk_by_index = dict(zip(pending, risks))
+        for i, risk_result in risk_by_index.items():
+            if isinstance(risk_result, BaseException):
+                results[i] = self._error_result(risk_result)
+            elif not risk_result.get("approved", False):
+                results[i] = self._risk_rejection(strategies[i], markets[i], risk_result)
+            else:
+                approved.append(i)
+        
+        # Steps 4+5 for every approved symbol
+        reviews = await asyncio.gather(
+            *(
+                call
+                for i in approved
+                for call in self._review_calls(
+                    inputs[i][0], strategies[i], markets[i], risk_by_index[i]
+                )
+            ),
+            return_exceptions=True,
+        )
+        
+        for n, i in enumerate(approved):
+            exec_result, audit_result = reviews[2 * n], reviews[2 * n + 1]
+            error = self._first_error(exec_result, audit_result)
+            if error is not None:
+                results[i] = self._error_result(error)
+                continue
+            results[i] = self._finalize_consensus(
+                inputs[i][0],
+                strategies[i],
+                markets[i],
+                risk_by_index[i],
+                exec_result,
+                audit_result,
+            )
+        
+        return results
+    
+    def _is_quiet_hold(self, strategy_result, market_result) -> bool:
+        return (
+            self.hold_fast_path
+            and strategy_result.get("decision") == "HOLD"
+            and strategy_result.get("confidence", 0.0) > self.hold_fast_path_confidence
+            and market_result.get("sentiment") == "NEUTRAL"
+        )
+    
+    def _quiet_hold(self, market_data, strategy_result, market_result) -> Dict[str, Any]:
+        """Consensus for a quiet bar without the remaining agent calls"""
+        return self._finalize_consensus(
+            market_data,
+            strategy_result,
+            market_result,
+            {"approved": True, "reasoning": "n/a"},
+            {},
+            {},
+        )
+    
+    @staticmethod
+    def _first_error(*results) -> Optional[BaseException]:
+        return next((r for r in results if isinstance(r, BaseException)), None)
+    
+    @staticmethod
+    def _risk_context(
+        market_data: Dict[str, Any],
+        portfolio: Dict[str, Any],
+        strategy_result: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        return {
+            "proposal": strategy_result,
+            "portfolio": portfolio,
+            "correlation": market_data.get("correlation", 0.0),
+            "max_position_size": market_data.get("max_position_size", 0.10)
+        }
+    
+    def _review_calls(self, market_data, strategy_result, market_result, risk_result):
+        """Execution and auditor coroutines for an approved proposal"""
+        return (
+            self.agents["execution"].analyze({
+                "recommended_size": market_data.get("position_size", 0.05)
+            }),
+            self.agents["auditor"].analyze({
+                "agent_decisions": [strategy_result, market_result, risk_result]
+            }),
+        )
+    
+    @staticmethod
+    def _risk_rejection(strategy_result, market_result, risk_result) -> Dict[str, Any]:
+        return {
+            "decision": "HOLD",
+            "confidence": 0.0,
+            "agent_votes": {
+                "strategy": strategy_result,
+                "market": market_result,
+                "risk": risk_result
+            },
+            "reasoning": f"Risk rejected: {risk_result.get('reasoning', 'Unknown')}",
+            "consensus_type": "REJECTED_BY_RISK"
+        }
+    
+    @staticmethod
+    def _error_result(error: BaseException) -> Dict[str, Any]:
+        return {
+            "decision": "HOLD",
+            "confidence": 0.0,
+            "agent_votes": {},
+            "reasoning": f"Error: {error}",
+            "consensus_type": "ERROR"
+        }
+    
+    def _finalize_consensus(
+        self,
+        market_data,
+        strategy_result,
+        market_result,
+        risk_result,
+        exec_result,
+        audit_result,
+    ) -> Dict[str, Any]:
+        """Calculate weighted consensus, log it and record it in history"""
+        consensus = self._calculate_weighted_consensus({
+            "strategy": strategy_result,
+            "market": market_result,
+            "risk": risk_result,
+            "execution": exec_result,
+            "auditor": audit_result
+        })
+        
+        self.logger.info(
+            "   Consensus: %s (confidence: %.0f%%)",
+            consensus["consensus_type"],
+            consensus["confidence"] * 100,
+        )
+        
+        # Store decision
+        timestamp = time.time_ns()
+        self.decision_history.append({
+            "timestamp": timestamp,
+            "symbol": market_data.get("symbol"),
+            "consensus": consensus
+        })
+        
+        if self.decision_log_dir:
+            votes = consensus["agent_votes"]
+            self._pending_decisions.append((
+                timestamp,
+                market_data.get("symbol"),
+                DECISION_IDX[consensus["decision"]],
+                consensus["confidence"],
+                CONSENSUS_TYPE_IDX[consensus["consensus_type"]],
+                votes["buy_score"],
+                votes["sell_score"],
+                votes["hold_score"],
+            ))
+            if len(self._pending_decisions) >= self.decision_log_flush_every:
+                self.flush_decisions()
+        
+        return consensus
+    
+    async def close(self):
+        """Write any buffered decisions (call on shutdown)
+
+        The agents' HTTP sessions are shared process-wide and stay open;
+        the process shutdown hook closes them with BaseAgent.aclose_shared().
+        """
+        await asyncio.to_thread(self.flush_decisions)
+
+    def flush_decisions(self):
+        """Append buffered decisions to the Parquet dataset at decision_log_dir"""
+        if not self.decision_log_dir or not self._pending_decisions:
+            return
+        rows, self._pending_decisions = self._pending_decisions, []
+        columns = list(zip(*rows))
+        table = pa.table(
+            {
+                "timestamp": pa.array(columns[0], type=pa.int64()),
+                "symbol": pa.array(columns[1], type=pa.string()),
+                "decision": pa.array(columns[2], type=pa.uint8()),
+                "confidence": pa.array(columns[3], type=pa.float32()),
+                "consensus_type": pa.array(columns[4], type=pa.uint8()),
+                "buy": pa.array(columns[5], type=pa.float32()),
+                "sell": pa.array(columns[6], type=pa.float32()),
+                "hold": pa.array(columns[7], type=pa.float32()),
             }
+        )
+        try:
+            # Each flush adds a new file to the dataset directory
+            pq.write_to_dataset(table, root_path=self.decision_log_dir)
+        except OSError as e:
+            self.logger.error("❌ Failed to write decision log: %s", e)
+    
+    @staticmethod
+    async def _gather_agents(*calls):
+        """Await agent calls concurrently, re-raising the first failure
+        only after every sibling has finished"""
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
     
     def _calculate_weighted_consensus(
         self, 
@@ -175,77 +484,40 @@ class AgentNetwork:
         - Execution: 0.15
         - Auditor: 0.10
         """
-        # Get agent weights
-        weights = {
-            "strategy": self.agents["strategy"].weight,
-            "risk": self.agents["risk"].weight,
-            "market": self.agents["market"].weight,
-            "execution": self.agents["execution"].weight,
-            "auditor": self.agents["auditor"].weight
-        }
+        weights = self._weight_vec
         
-        # Calculate weighted scores for each decision
-        buy_score = 0.0
-        sell_score = 0.0
-        hold_score = 0.0
+        # Weighted scores indexed by DECISIONS (BUY, SELL, HOLD) + discard slot
+        scores = np.zeros(len(DECISIONS) + 1)
         
-        # Strategy vote
+        # Strategy vote (unknown decisions count as HOLD)
         strategy_decision = agent_results["strategy"].get("decision", "HOLD")
         strategy_confidence = agent_results["strategy"].get("confidence", 0.5)
-        strategy_weight = weights["strategy"]
-        
-        if strategy_decision == "BUY":
-            buy_score += strategy_weight * strategy_confidence
-        elif strategy_decision == "SELL":
-            sell_score += strategy_weight * strategy_confidence
-        else:
-            hold_score += strategy_weight * strategy_confidence
+        strategy_idx = DECISION_IDX.get(strategy_decision, HOLD_IDX)
+        scores[strategy_idx] += weights[_W_STRATEGY] * strategy_confidence
         
         # Market sentiment influence
         market_sentiment = agent_results["market"].get("sentiment", "NEUTRAL")
         market_confidence = agent_results["market"].get("confidence", 0.5)
-        market_weight = weights["market"]
-        
-        if market_sentiment == "BULLISH":
-            buy_score += market_weight * market_confidence
-        elif market_sentiment == "BEARISH":
-            sell_score += market_weight * market_confidence
-        else:
-            hold_score += market_weight * market_confidence
+        scores[SENTIMENT_IDX.get(market_sentiment, HOLD_IDX)] += (
+            weights[_W_MARKET] * market_confidence
+        )
         
         # Risk approval (binary - either 0 or full weight)
         risk_approved = agent_results["risk"].get("approved", False)
-        risk_weight = weights["risk"]
-        
-        if risk_approved:
-            # Risk approves = boost the strategy decision
-            if strategy_decision == "BUY":
-                buy_score += risk_weight
-            elif strategy_decision == "SELL":
-                sell_score += risk_weight
-        else:
-            # Risk rejects = boost HOLD
-            hold_score += risk_weight
+        scores[_RISK_TARGET[bool(risk_approved)][strategy_idx]] += weights[_W_RISK]
         
         # Normalize scores
-        total_score = buy_score + sell_score + hold_score
-        if total_score > 0:
-            buy_pct = buy_score / total_score
-            sell_pct = sell_score / total_score
-            hold_pct = hold_score / total_score
-        else:
-            buy_pct = sell_pct = hold_pct = 0.33
-        
-        # Determine final decision
-        if buy_pct > sell_pct and buy_pct > hold_pct:
-            final_decision = "BUY"
-            final_confidence = buy_pct
-        elif sell_pct > buy_pct and sell_pct > hold_pct:
-            final_decision = "SELL"
-            final_confidence = sell_pct
-        else:
-            final_decision = "HOLD"
-            final_confidence = hold_pct
+        scores = scores[:_DISCARD_IDX]
+        total_score = scores.sum()
+        pcts = scores / total_score if total_score > 0 else np.full(3, 0.33)
+        
+        # A decision needs a strict majority over both others, else HOLD
+        final_idx = int(pcts.argmax())
+        if np.count_nonzero(pcts == pcts[final_idx]) > 1:
+            final_idx = HOLD_IDX
+        final_decision = DECISIONS[final_idx]
+        final_confidence = float(pcts[final_idx])
+        buy_pct, sell_pct, hold_pct = pcts.tolist()
         
         # Classify consensus type
         if final_confidence > 0.70:
@@ -288,6 +560,58 @@ class AgentNetwork:
             "individual_results": agent_results
         }
     
+    def _calculate_weighted_consensus_batch(
+        self,
+        strategy_decisions,
+        strategy_conf,
+        market_sentiments,
+        market_conf,
+        risk_approved,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized _calculate_weighted_consensus over N bars (e.g. a backtest
+        replaying cached agent outputs). Decisions/sentiments may be label
+        strings or pre-encoded indices into DECISIONS.
+        
+        Returns arrays: decision, confidence, buy_score, sell_score, hold_score
+        """
+        strategy_idx = _encode_labels(strategy_decisions, _DECISION_TABLE)
+        market_idx = _encode_labels(market_sentiments, _SENTIMENT_TABLE)
+        strategy_conf = np.asarray(strategy_conf, dtype=float)
+        market_conf = np.asarray(market_conf, dtype=float)
+        approved = np.asarray(risk_approved, dtype=bool)
+        
+        n = strategy_idx.shape[0]
+        rows = np.arange(n)
+        scores = np.zeros((n, len(DECISIONS) + 1))
+        
+        weights = self._weight_vec
+        scores[rows, strategy_idx] += weights[_W_STRATEGY] * strategy_conf
+        scores[rows, market_idx] += weights[_W_MARKET] * market_conf
+        
+        risk_target = _RISK_TARGET_ARRAY[approved.astype(np.intp), strategy_idx]
+        scores[rows, risk_target] += weights[_W_RISK]
+        scores = scores[:, :_DISCARD_IDX]
+        
+        totals = scores.sum(axis=1, keepdims=True)
+        pcts = np.divide(
+            scores, totals, out=np.full_like(scores, 0.33), where=totals > 0
+        )
+        
+        # Strict majority or HOLD, as in the scalar version
+        final_idx = pcts.argmax(axis=1)
+        best = pcts[rows, final_idx]
+        ties = (pcts == best[:, None]).sum(axis=1) > 1
+        final_idx = np.where(ties, HOLD_IDX, final_idx)
+        
+        return {
+            "decision": np.array(DECISIONS)[final_idx],
+            "confidence": pcts[rows, final_idx],
+            "buy_score": pcts[:, 0],
+            "sell_score": pcts[:, 1],
+            "hold_score": pcts[:, 2],
+        }
+    
     def update_agent_weights(self, performance_data: Dict[str, Dict]):
         """
         Adjust agent weights based on performance
@@ -315,6 +639,7 @@ class AgentNetwork:
         total_weight = sum(agent.weight for agent in self.agents.values())
         for agent in self.agents.values():
             agent.weight /= total_weight
+        self._refresh_weights()
         
         self.logger.info("🎯 Agent weights rebalanced")
     
@@ -0,0 +1,107 @@
+"""
+Agent Pool - Runs agents on several event loops, one per worker thread
+Lets think() calls from different agents run in parallel across cores on
+free-threaded Python (3.14t with PYTHON_GIL=0)
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import threading
+from typing import Dict, List, Optional
+
+from src.ollama_agents.base_agent import BaseAgent
+from src.utils.logger import get_logger
+
+
+class AgentPool:
+    """
+    Fixed set of worker threads, each running its own asyncio event loop
+
+    Each agent is pinned to one loop the first time it is submitted, so its
+    conversation history and HTTP session are only ever touched from one
+    thread. Loops are never shared between threads.
+
+    On a GIL build this still works, but the threads only overlap on I/O;
+    the CPU-side work (JSON encoding, response parsing) runs in parallel
+    only when Python is free-threaded and started with PYTHON_GIL=0.
+    """
+
+    def __init__(self, workers: int = 4):
+        self.logger = get_logger(__name__)
+        self.workers = workers
+        self.loops: List[asyncio.AbstractEventLoop] = []
+        self._threads: List[threading.Thread] = []
+        self._assignments: Dict[int, asyncio.AbstractEventLoop] = {}
+        self._next_slot = itertools.count()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads and their event loops"""
+        if self.loops:
+            return
+        for i in range(self.workers):
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=self._run_loop, args=(loop,), name=f"agent-pool-{i}", daemon=True
+            )
+            thread.start()
+            self.loops.append(loop)
+            self._threads.append(thread)
+        self.logger.info("🧵 Agent pool started with %d event loops", self.workers)
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def _loop_for(self, agent: BaseAgent) -> asyncio.AbstractEventLoop:
+        """Pin agents to loops round-robin on first use"""
+        with self._lock:
+            loop = self._assignments.get(id(agent))
+            if loop is None:
+                loop = self.loops[next(self._next_slot) % len(self.loops)]
+                self._assignments[id(agent)] = loop
+            return loop
+
+    def submit(
+        self, agent: BaseAgent, prompt: str, system_prompt: Optional[str] = None
+    ) -> concurrent.futures.Future:
+        """Schedule agent.think() on the agent's loop; returns a thread-safe future"""
+        if not self.loops:
+            raise RuntimeError("AgentPool not started")
+        return asyncio.run_coroutine_threadsafe(
+            agent.think(prompt, system_prompt), self._loop_for(agent)
+        )
+
+    async def think(
+        self, agent: BaseAgent, prompt: str, system_prompt: Optional[str] = None
+    ) -> str:
+        """Await agent.think() running on its pool loop from any event loop"""
+        return await asyncio.wrap_future(self.submit(agent, prompt, system_prompt))
+
+    def shutdown(self, timeout: float = 5.0):
+        """Close each loop's HTTP session, stop the loops and join the threads"""
+        for loop in self.loops:
+            closing = asyncio.run_coroutine_threadsafe(
+                BaseAgent.aclose_loop_session(), loop
+            )
+            try:
+                closing.result(timeout)
+            except Exception as e:
+                self.logger.warning("Agent pool session close failed: %s", e)
+            loop.call_soon_threadsafe(loop.stop)
+        for thread in self._threads:
+            thread.join(timeout)
+        for loop in self.loops:
+            loop.close()
+        self.loops = []
+        self._threads = []
+        self._assignments.clear()
+
+    def __enter__(self) -> "AgentPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
@@ -50,7 +50,9 @@ class VOLTStrategy:
         self.agent_network = None
         if self.use_agents:
             try:
-                self.agent_network = AgentNetwork()
+                self.agent_network = AgentNetwork(
+                    self.config_manager.get("agent_network", {})
+                )
                 self.logger.info("🤖 Ollama multi-agent system enabled")
             except Exception as e:
                 self.logger.warning(
@@ -485,6 +487,11 @@ class VOLTStrategy:
             self.logger.error(f"⚠️ Agent validation failed: {e}, using signal as-is")
             return signal  # Fallback: use original signal if agents fail
 
+    async def close(self):
+        """Release strategy resources (flushes the agent decision log)"""
+        if self.agent_network is not None:
+            await self.agent_network.close()
+
     async def _load_lstm_model(self):
         """Load LSTM model for price prediction"""
         self.logger.info("🧠 Loading LSTM model...")
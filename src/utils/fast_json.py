@@ -0,0 +1,72 @@
+"""
+VOLT Trading JSON helpers
+Uses orjson when installed, falling back to the stdlib json module
+"""
+
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialize obj to a compact JSON string"""
+    return dumpb(obj, default=default).decode()
+
+
+def _numpy_default(default: Optional[Callable[[Any], Any]]) -> Callable[[Any], Any]:
+    """Stdlib default hook that serializes numpy values like orjson does"""
+
+    def convert(obj: Any) -> Any:
+        if type(obj).__module__ == "numpy":
+            return obj.tolist()
+        if default is not None:
+            return default(obj)
+        raise TypeError(
+            f"Object of type {type(obj).__name__} is not JSON serializable"
+        )
+
+    return convert
+
+
+def dumpb(
+    obj: Any,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    indent: bool = False,
+    newline: bool = False,
+) -> bytes:
+    """Serialize obj to JSON bytes, numpy values included.
+
+    sort_keys gives a stable encoding, indent pretty-prints with two spaces
+    and newline ends the output with a newline, as one JSONL record.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(obj, default=default, option=option)
+    data = json.dumps(
+        obj,
+        sort_keys=sort_keys,
+        default=_numpy_default(default),
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+    ).encode()
+    return data + b"\n" if newline else data
@@ -9,9 +9,18 @@ import json
 from datetime import datetime
 from aiohttp import web
 
-from src.exchanges.bybit_exchange import BybitTestnetExchange, TradingViewWebhookHandler
+from src.exchanges.bybit_exchange import (
+    BybitTestnetExchange,
+    TradingViewWebhookHandler,
+)
 from src.core.config_manager import ConfigManager
 from src.utils.logger import get_logger
+from src.utils import fast_json
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 
 async def create_app(config_manager: ConfigManager):
@@ -30,11 +39,6 @@ async def create_app(config_manager: ConfigManager):
 
     app = web.Application()
 
-    async def handle_webhook(request):
-        payload = await request.json()
-        result = await webhook_handler.handle_webhook(payload)
-        return web.json_response(result)
-
     async def handle_status(request):
         balance = await exchange.get_balance()
         positions = await exchange.get_positions()
@@ -62,22 +66,35 @@ async def create_app(config_manager: ConfigManager):
                         ]
                     ),
                 },
-            }
+            },
+            dumps=fast_json.dumps,
         )
 
     async def handle_test(request):
         test_order = await exchange.create_market_buy_order("BTC/USDT", 0.001)
         return web.json_response(
-            {"message": "Test order executed", "order": test_order}
+            {"message": "Test order executed", "order": test_order},
+            dumps=fast_json.dumps,
         )
 
-    app.router.add_post("/webhook/tradingview", handle_webhook)
+    # Webhooks are acknowledged with 202 and executed by queue workers
+    app.router.add_post("/webhook/tradingview", webhook_handler.queue_webhook)
     app.router.add_get("/status", handle_status)
     app.router.add_post("/test", handle_test)
 
     app["exchange"] = exchange
     app["webhook_handler"] = webhook_handler
 
+    async def start_workers(app):
+        webhook_handler.start_workers()
+
+    async def stop_workers(app):
+        # Finish already-acknowledged webhooks before the exchange goes away
+        await webhook_handler.stop_workers()
+
+    app.on_startup.append(start_workers)
+    app.on_cleanup.append(stop_workers)
+
     return app
 
 
@@ -112,7 +129,7 @@ async def main():
     logger.info('   {"action": "sell", "symbol": "ETH/USDT", "amount": 0.1}')
     logger.info("")
     logger.info("🔗 Endpoints:")
-    logger.info(f"   POST /webhook/tradingview - Execute trade")
+    logger.info(f"   POST /webhook/tradingview - Queue trade (202)")
     logger.info(f"   GET  /status              - Check balance & positions")
     logger.info(f"   POST /test                - Execute test order")
     logger.info("")
@@ -121,10 +138,14 @@ async def main():
 
     try:
         await asyncio.Event().wait()
-    except KeyboardInterrupt:
-        logger.info("\n🛑 Shutting down...")
+    finally:
+        logger.info("🛑 Shutting down...")
         await runner.cleanup()
 
 
 if __name__ == "__main__":
+    # libuv-backed event loop raises aiohttp request throughput when available
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     asyncio.run(main())
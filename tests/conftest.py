@@ -0,0 +1,43 @@
+"""Shared test fixtures"""
+
+import pytest
+
+
+class StubAgent:
+    """Agent stand-in: analyze() returns result, raises it if it is an
+    exception, or calls it with the context if it is a function"""
+
+    def __init__(self, result):
+        self.result = result
+
+    async def analyze(self, context):
+        result = self.result(context) if callable(self.result) else self.result
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+# Agent results that reach an approved BUY consensus
+_APPROVED_BUY = {
+    "strategy": {"decision": "BUY", "confidence": 0.8},
+    "market": {"sentiment": "BULLISH", "confidence": 0.7},
+    "risk": {"approved": True},
+    "execution": {},
+    "auditor": {},
+}
+
+
+@pytest.fixture
+def stub_agents():
+    """Build an AgentNetwork.agents mapping of StubAgents
+
+    Roles not passed as keyword arguments vote for an approved BUY.
+    """
+
+    def build(**results):
+        return {
+            role: StubAgent(results.get(role, default))
+            for role, default in _APPROVED_BUY.items()
+        }
+
+    return build
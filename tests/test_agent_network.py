@@ -0,0 +1,129 @@
+"""
+Tests for AgentNetwork weighted consensus
+"""
+
+import pytest
+
+from src.ollama_agents.agent_network import AgentNetwork
+from src.ollama_agents.base_agent import BaseAgent
+
+
+CASES = [
+    ("BUY", 0.8, "BULLISH", 0.7, True),
+    ("SELL", 0.9, "BEARISH", 0.6, True),
+    ("BUY", 0.6, "BEARISH", 0.9, False),
+    ("HOLD", 0.5, "NEUTRAL", 0.5, True),
+    ("SELL", 0.4, "BULLISH", 0.4, True),
+    ("UNKNOWN", 0.7, "SIDEWAYS", 0.3, False),
+]
+
+
+def test_consensus_batch_matches_scalar():
+    """Vectorized consensus agrees with the per-bar calculation"""
+    network = AgentNetwork()
+
+    batch = network._calculate_weighted_consensus_batch(
+        [c[0] for c in CASES],
+        [c[1] for c in CASES],
+        [c[2] for c in CASES],
+        [c[3] for c in CASES],
+        [c[4] for c in CASES],
+    )
+
+    for i, (decision, conf, sentiment, m_conf, approved) in enumerate(CASES):
+        scalar = network._calculate_weighted_consensus(
+            {
+                "strategy": {"decision": decision, "confidence": conf},
+                "market": {"sentiment": sentiment, "confidence": m_conf},
+                "risk": {"approved": approved},
+                "execution": {},
+                "auditor": {},
+            }
+        )
+        assert batch["decision"][i] == scalar["decision"]
+        assert batch["confidence"][i] == pytest.approx(scalar["confidence"])
+        assert batch["buy_score"][i] == pytest.approx(
+            scalar["agent_votes"]["buy_score"]
+        )
+
+
+@pytest.mark.asyncio
+async def test_propose_trades_batch_isolates_failures(stub_agents):
+    """A failing or rejected symbol falls back to HOLD without affecting others"""
+    network = AgentNetwork()
+    network.agents = stub_agents(
+        strategy=lambda context: (
+            RuntimeError("model unavailable")
+            if context["symbol"] == "ETH/USDT"
+            else {"decision": "BUY", "confidence": 0.8}
+        )
+    )
+
+    results = await network.propose_trades_batch([
+        ({"symbol": "BTC/USDT"}, {}),
+        ({"symbol": "ETH/USDT"}, {}),
+    ])
+
+    assert results[0]["decision"] == "BUY"
+    assert results[1]["decision"] == "HOLD"
+    assert results[1]["consensus_type"] == "ERROR"
+
+    network.agents = stub_agents(risk={"approved": False, "reasoning": "too big"})
+    [rejected] = await network.propose_trades_batch([({"symbol": "BTC/USDT"}, {})])
+    assert rejected["consensus_type"] == "REJECTED_BY_RISK"
+
+
+@pytest.mark.asyncio
+async def test_hold_fast_path_skips_remaining_agents(stub_agents):
+    """A confident HOLD on a NEUTRAL market never reaches the risk agent"""
+    network = AgentNetwork({"hold_fast_path": True})
+    network.agents = stub_agents(
+        strategy={"decision": "HOLD", "confidence": 0.9},
+        market={"sentiment": "NEUTRAL", "confidence": 0.6},
+        risk=AssertionError("risk agent called"),
+        execution=AssertionError("execution agent called"),
+        auditor=AssertionError("auditor agent called"),
+    )
+
+    result = await network.propose_trade({"symbol": "BTC/USDT"}, {})
+
+    assert result["decision"] == "HOLD"
+    assert result["consensus_type"] == "STRONG_HOLD"
+
+
+@pytest.mark.asyncio
+async def test_decision_log_reaches_disk_on_close(tmp_path, stub_agents):
+    """Buffered decisions below the flush threshold are written by close()"""
+    pq = pytest.importorskip("pyarrow.parquet")
+    network = AgentNetwork({"decision_log_dir": str(tmp_path / "decisions")})
+    network.agents = stub_agents()
+
+    await network.propose_trades_batch([({"symbol": "BTC/USDT"}, {})] * 3)
+    assert not (tmp_path / "decisions").exists()
+
+    await network.close()
+
+    table = pq.read_table(tmp_path / "decisions")
+    assert table.num_rows == 3
+    assert table.column("symbol").to_pylist() == ["BTC/USDT"] * 3
+
+
+@pytest.mark.asyncio
+async def test_close_keeps_shared_agent_sessions():
+    """Closing one network leaves the sessions other agents share alone"""
+    pytest.importorskip("aiohttp")
+    network = AgentNetwork()
+    other = AgentNetwork()
+    requests_session = BaseAgent._get_shared_session()
+    aio_session = BaseAgent._get_aio_session()
+
+    await network.close()
+
+    assert BaseAgent._shared_session is requests_session
+    assert other.agents["strategy"]._session is requests_session
+    assert not aio_session.closed
+
+    # The process shutdown hook is what releases them
+    await BaseAgent.aclose_shared()
+    assert BaseAgent._shared_session is None
+    assert aio_session.closed
@@ -0,0 +1,379 @@
+"""Tests for AnyLLMAdapter provider dispatch"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm.anyllm_adapter import (
+    AnyLLMAdapter,
+    MultiProviderAgent,
+    Provider,
+    SemanticLLMCache,
+    _system_block,
+    decision_ready,
+    parse_decision,
+)
+
+
+USER = [{"role": "user", "content": "BTC at 50000, decide"}]
+
+
+class _FakeClient:
+    """any-llm client stand-in that records calls"""
+
+    def __init__(self, content="HOLD 0.5", error=None, delay=0.0):
+        self.content = content
+        self.error = error
+        self.delay = delay
+        self.calls = []
+
+    async def acompletion(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class _FakeStream:
+    """Async iterator of streamed completion chunks"""
+
+    def __init__(self, pieces):
+        self._pieces = iter(pieces)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            piece = next(self._pieces)
+        except StopIteration:
+            raise StopAsyncIteration
+        delta = SimpleNamespace(content=piece)
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def aclose(self):
+        self.closed = True
+
+
+class _FakeStreamingClient(_FakeClient):
+    def __init__(self, pieces, error=None):
+        super().__init__(error=error)
+        self.stream = _FakeStream(pieces)
+
+    async def acompletion(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.error is not None:
+            raise self.error
+        return self.stream
+
+
+def _adapter(config=None, **clients):
+    adapter = AnyLLMAdapter({"prewarm": False, **(config or {})})
+    adapter.available_providers = [Provider[name.upper()] for name in clients]
+    for name, client in clients.items():
+        adapter._clients[Provider[name.upper()]] = client
+    return adapter
+
+
+# -- request options --
+
+
+@pytest.mark.asyncio
+async def test_temperature_omitted_unless_set():
+    client = _FakeClient()
+    adapter = _adapter(ollama=client)
+
+    await adapter.complete(USER)
+
+    assert "temperature" not in client.calls[0]
+
+
+@pytest.mark.asyncio
+async def test_temperature_forwarded_from_config_and_caller():
+    client = _FakeClient()
+    adapter = _adapter({"ollama": {"temperature": 0.3}}, ollama=client)
+
+    await adapter.complete(USER)
+    await adapter.complete(USER, temperature=0.9)
+
+    assert [c["temperature"] for c in client.calls] == [0.3, 0.9]
+
+
+# -- failover --
+
+
+@pytest.mark.asyncio
+async def test_unexpected_error_fails_over_instead_of_raising():
+    broken = _FakeClient(error=KeyError("choices"))
+    backup = _FakeClient(content="BUY 0.8")
+    adapter = _adapter(ollama=broken, openai=backup)
+
+    result = await adapter.complete(USER)
+
+    assert result["provider"] == "openai"
+    assert result["content"] == "BUY 0.8"
+
+
+@pytest.mark.asyncio
+async def test_all_providers_failing_returns_error_result():
+    adapter = _adapter(ollama=_FakeClient(error=TypeError("bad payload")))
+
+    result = await adapter.complete(USER)
+
+    assert result["provider"] == "none"
+    assert "bad payload" in result["error"]
+
+
+# -- prewarm --
+
+
+@pytest.mark.asyncio
+async def test_prewarm_lists_models_without_completion():
+    client = _FakeClient()
+    listed = []
+
+    async def alist_models():
+        listed.append(True)
+        return []
+
+    client.alist_models = alist_models
+    adapter = _adapter(ollama=_FakeClient(), openai=client)
+
+    await adapter.prewarm()
+
+    assert listed == [True]
+    assert client.calls == []
+
+
+# -- caching and coalescing --
+
+
+@pytest.mark.asyncio
+async def test_deterministic_requests_served_from_cache():
+    client = _FakeClient()
+    adapter = _adapter(ollama=client)
+
+    first = await adapter.complete(USER, temperature=0)
+    second = await adapter.complete(USER, temperature=0)
+    await adapter.complete(USER, temperature=0.7)
+
+    assert second is first
+    assert len(client.calls) == 2
+    assert adapter.cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_call():
+    client = _FakeClient(delay=0.05)
+    adapter = _adapter(ollama=client)
+
+    results = await asyncio.gather(*(adapter.complete(USER) for _ in range(5)))
+
+    assert len(client.calls) == 1
+    assert all(r is results[0] for r in results)
+    assert adapter._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    client = _FakeClient(delay=0.05)
+    adapter = _adapter(ollama=client)
+
+    leader = asyncio.ensure_future(adapter.complete(USER))
+    follower = asyncio.ensure_future(adapter.complete(USER))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert (await follower)["content"] == "HOLD 0.5"
+    assert len(client.calls) == 1
+
+
+# -- circuit breaker --
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_repeated_failures(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(
+        "src.llm.anyllm_adapter.time.monotonic", lambda: now[0]
+    )
+    broken = _FakeClient(error=OSError("connection refused"))
+    adapter = _adapter(
+        {"breaker_threshold": 2, "breaker_cooldown": 30.0}, ollama=broken
+    )
+
+    for i in range(3):
+        await adapter.complete([{"role": "user", "content": f"try {i}"}])
+    assert len(broken.calls) == 2
+
+    # Half-open after the cooldown: one probe goes through and succeeds
+    now[0] += 31
+    broken.error = None
+    result = await adapter.complete(USER)
+    assert result["provider"] == "ollama"
+    assert len(broken.calls) == 3
+    assert adapter._breaker_allows(Provider.OLLAMA)
+
+
+# -- agents --
+
+
+def test_per_call_system_messages_are_reused_and_bounded():
+    agent = MultiProviderAgent("a", {"prewarm": False})
+
+    first = agent._system_message("You are a risk analyst")
+    assert agent._system_message("You are a risk analyst") is first
+
+    for i in range(500):
+        agent._system_message(f"prompt {i}")
+    info = _system_block.cache_info()
+    assert info.currsize <= info.maxsize
+
+
+# -- early stop --
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"reasoning": "no BUY yet, RSI 72 is',
+        "BUY at 42000, confidence",
+        '{"decision": "BUY", "confidence": 0.',
+        '{"decision": "BUY", "confidence": 0.8',
+        '{"decision": "MAYBE", "confidence": 0.8,',
+    ],
+)
+def test_decision_ready_ignores_incomplete_or_unstructured_text(text):
+    assert not decision_ready(text)
+    assert parse_decision(text) is None
+
+
+def test_decision_ready_on_complete_fields():
+    text = '{"decision": "SELL",\n "confidence": 0.75, "reasoning": "RSI at 8'
+
+    assert decision_ready(text)
+    assert parse_decision(text) == {"decision": "SELL", "confidence": 0.75}
+
+
+PIECES = ['{"decision": "BUY", ', '"confidence": 0.8', ', "reasoning": "', "x" * 50]
+
+
+@pytest.mark.asyncio
+async def test_complete_streaming_stops_once_decision_ready():
+    client = _FakeStreamingClient(PIECES)
+    adapter = _adapter(ollama=client)
+
+    result = await adapter.complete_streaming(USER, early_stop=decision_ready)
+
+    assert result["stopped_early"]
+    assert result["content"] == "".join(PIECES[:3])
+    assert parse_decision(result["content"])["decision"] == "BUY"
+    assert client.stream.closed
+    assert client.calls[0]["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_complete_streaming_reads_to_end_without_predicate():
+    adapter = _adapter(ollama=_FakeStreamingClient(PIECES))
+
+    result = await adapter.complete_streaming(USER)
+
+    assert not result["stopped_early"]
+    assert result["content"] == "".join(PIECES)
+
+
+@pytest.mark.asyncio
+async def test_complete_streaming_falls_back_on_failure():
+    broken = _FakeStreamingClient([], error=OSError("refused"))
+    backup = _FakeStreamingClient(PIECES)
+    adapter = _adapter(ollama=broken, openai=backup)
+
+    result = await adapter.complete_streaming(USER, early_stop=decision_ready)
+
+    assert result["provider"] == "openai"
+    assert result["stopped_early"]
+
+
+# -- semantic cache --
+
+
+def _prompt(price, symbol="BTC/USDT"):
+    return [{"role": "user", "content": f"{symbol} at {price}, RSI 55. Decide"}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.llm.anyllm_adapter.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_semantic_cache_hits_within_tolerance(clock):
+    cache = SemanticLLMCache(rel_tol=0.001)
+    cache.set("ollama:m", _prompt(50000), {"content": "HOLD"})
+
+    assert cache.get("ollama:m", _prompt(50020)) == {"content": "HOLD"}
+    assert cache.stats == {"hits": 1, "misses": 0}
+
+
+@pytest.mark.parametrize(
+    "messages",
+    [
+        _prompt(50100),  # 0.2% price drift
+        _prompt(50000, symbol="ETH/USDT"),  # same numbers, other pair
+        [{"role": "user", "content": "BTC/USDT at 50000, RSI 55 and 70. Decide"}],
+    ],
+)
+def test_semantic_cache_misses_on_numeric_drift_or_other_template(clock, messages):
+    cache = SemanticLLMCache(rel_tol=0.001)
+    cache.set("ollama:m", _prompt(50000), {"content": "HOLD"})
+
+    assert cache.get("ollama:m", messages) is None
+    assert cache.get("openai:m", _prompt(50000)) is None
+
+
+def test_semantic_cache_entries_expire(clock):
+    cache = SemanticLLMCache(ttl=300.0)
+    cache.set("ollama:m", _prompt(50000), {"content": "HOLD"})
+
+    clock[0] += 301
+
+    assert cache.get("ollama:m", _prompt(50000)) is None
+
+
+def test_semantic_cache_evicts_least_recent_template(clock):
+    cache = SemanticLLMCache(maxsize=2)
+    cache.set("p", _prompt(1, "BTC/USDT"), {"content": "btc"})
+    cache.set("p", _prompt(1, "ETH/USDT"), {"content": "eth"})
+    cache.set("p", _prompt(1, "BTC/USDT"), {"content": "btc again"})
+    cache.set("p", _prompt(1, "SOL/USDT"), {"content": "sol"})
+
+    assert cache.get("p", _prompt(1, "ETH/USDT")) is None
+    assert cache.get("p", _prompt(1, "BTC/USDT")) is not None
+    assert cache.get("p", _prompt(1, "SOL/USDT")) == {"content": "sol"}
+
+
+def test_semantic_cache_caps_entries_per_template(clock):
+    cache = SemanticLLMCache(per_template=2)
+    for price in (100, 200, 300):
+        cache.set("p", _prompt(price), {"content": str(price)})
+
+    assert cache.get("p", _prompt(100)) is None
+    assert cache.get("p", _prompt(300)) == {"content": "300"}
+
+
+@pytest.mark.asyncio
+async def test_adapter_uses_semantic_cache_for_deterministic_requests():
+    client = _FakeClient()
+    adapter = _adapter({"semantic_cache": {"enabled": True}}, ollama=client)
+
+    await adapter.complete(_prompt(50000), temperature=0)
+    await adapter.complete(_prompt(50010), temperature=0)
+    await adapter.complete(_prompt(51000), temperature=0)
+
+    assert len(client.calls) == 2
@@ -0,0 +1,138 @@
+"""Tests for BaseAgent conversation history and the AgentPool"""
+
+import asyncio
+import re
+import threading
+
+import pytest
+
+from src.ollama_agents.agent_pool import AgentPool
+from src.ollama_agents.base_agent import MockOllamaAgent
+
+
+@pytest.fixture
+def agent():
+    return MockOllamaAgent("TEST_01", "tester")
+
+
+# -- message IDs --
+
+
+def test_message_ids_unique_and_ordered(agent):
+    other = MockOllamaAgent("TEST_02", "tester")
+    ids = [agent._generate_message_id() for _ in range(3)]
+    ids.append(other._generate_message_id())
+
+    assert len(set(ids)) == 4
+    assert all(re.fullmatch(r"MSG_TEST_0[12]_[0-9a-f]{16}", i) for i in ids)
+    # One process-wide counter: later IDs sort after earlier ones
+    assert [i[-16:] for i in ids] == sorted(i[-16:] for i in ids)
+
+
+# -- history window --
+
+
+def test_history_cut_back_in_one_step(agent):
+    agent.max_history = 4
+    for i in range(7):
+        agent._add_to_history("user", f"m{i}")
+    assert len(agent.conversation_history) == 7
+    assert not agent._evict_pending
+
+    agent._add_to_history("user", "m7")
+
+    assert [m["content"] for m in agent.conversation_history] == [
+        "m4",
+        "m5",
+        "m6",
+        "m7",
+    ]
+    assert agent._evict_pending
+
+
+def test_eviction_waits_for_cut_or_budget(agent):
+    agent.archive_after = 2
+    for i in range(6):
+        agent._add_to_history("user", f"m{i}")
+    before = list(agent.conversation_history)
+
+    agent._evict_history()
+
+    assert list(agent.conversation_history) == before
+
+
+def test_eviction_rewrites_old_messages(agent):
+    agent.archive_after = 5
+    agent.history_char_budget = 10_000
+    agent._add_to_history("user", "oldest question")
+    agent._add_to_history("assistant", "ERROR: Ollama timeout after 120s")
+    agent._add_to_history("assistant", "<think>long reasoning</think>BUY 0.8")
+    for i in range(3):
+        agent._add_to_history("user", f"recent {i}")
+    agent._evict_pending = True
+
+    agent._evict_history()
+
+    contents = [m["content"] for m in agent.conversation_history]
+    assert contents[0] == "[archived]"
+    assert contents[1].startswith("[prior failure: ERROR: Ollama timeout")
+    assert contents[2] == "BUY 0.8"
+    assert contents[3:] == ["recent 0", "recent 1", "recent 2"]
+
+
+def test_eviction_drops_archived_messages_over_budget(agent):
+    agent.archive_after = 3
+    agent.history_char_budget = 40
+    for i in range(6):
+        agent._add_to_history("user", f"message number {i}")
+
+    agent._evict_history()
+
+    # Archived markers go first; recent messages stay even over budget
+    contents = [m["content"] for m in agent.conversation_history]
+    assert contents == [f"message number {i}" for i in (3, 4, 5)]
+
+
+# -- agent pool --
+
+
+class _LoopRecordingAgent(MockOllamaAgent):
+    """Mock agent that reports which thread and loop ran think()"""
+
+    async def think(self, prompt, system_prompt=None, use_extended_context=True):
+        await asyncio.sleep(0)
+        return (prompt, threading.current_thread().name, asyncio.get_running_loop())
+
+
+def test_agent_pool_pins_each_agent_to_one_loop():
+    agents = [_LoopRecordingAgent(f"POOL_{i}", "tester") for i in range(4)]
+
+    with AgentPool(workers=2) as pool:
+        futures = [pool.submit(a, f"p{n}") for n in range(3) for a in agents]
+        results = [f.result(5) for f in futures]
+        threads = list(pool._threads)
+
+    loops_by_agent = {}
+    for (prompt, thread_name, loop), agent in zip(results, agents * 3):
+        assert thread_name.startswith("agent-pool-")
+        loops_by_agent.setdefault(agent.agent_id, set()).add(loop)
+
+    assert all(len(loops) == 1 for loops in loops_by_agent.values())
+    assert len({next(iter(l)) for l in loops_by_agent.values()}) == 2
+    assert [r[0] for r in results[:4]] == ["p0"] * 4
+    assert not any(t.is_alive() for t in threads)
+
+
+@pytest.mark.asyncio
+async def test_agent_pool_awaitable_from_another_loop():
+    agent = _LoopRecordingAgent("POOL_X", "tester")
+    with AgentPool(workers=1) as pool:
+        prompt, _, loop = await pool.think(agent, "hello")
+
+    assert prompt == "hello"
+    assert loop is not asyncio.get_running_loop()
+
+
+def test_agent_pool_requires_start():
+    with pytest.raises(RuntimeError):
+        AgentPool().submit(MockOllamaAgent("POOL_Y", "tester"), "hi")
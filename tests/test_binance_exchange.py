@@ -61,13 +61,36 @@ async def test_initialize_creates_client_and_loads_markets(exchange):
     with patch("src.exchanges.binance_exchange.ccxt_async") as mock_ccxt:
         mock_client = AsyncMock()
         mock_client.set_sandbox_mode = MagicMock()  # sync method on real client
+        mock_client.markets = {}
         mock_ccxt.binance.return_value = mock_client
 
         await exchange.initialize()
+        try:
+            mock_ccxt.binance.assert_called_once()
+            mock_client.set_sandbox_mode.assert_called_once_with(True)
+            mock_client.load_markets.assert_awaited_once()
+        finally:
+            # initialize() opens a real aiohttp session - release it
+            await exchange.close()
 
-        mock_ccxt.binance.assert_called_once()
-        mock_client.set_sandbox_mode.assert_called_once_with(True)
-        mock_client.load_markets.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_initialize_caches_usdt_bases(exchange):
+    with patch("src.exchanges.binance_exchange.ccxt_async") as mock_ccxt:
+        mock_client = AsyncMock()
+        mock_client.set_sandbox_mode = MagicMock()
+        mock_client.markets = {
+            "BTC/USDT": {"base": "BTC", "quote": "USDT", "spot": True},
+            "ETH/BTC": {"base": "ETH", "quote": "BTC", "spot": True},
+            "SOL/USDT:USDT": {"base": "SOL", "quote": "USDT", "spot": False},
+        }
+        mock_ccxt.binance.return_value = mock_client
+
+        await exchange.initialize()
+        try:
+            assert exchange._usdt_bases == frozenset({"BTC"})
+        finally:
+            await exchange.close()
 
 
 @pytest.mark.asyncio
@@ -75,11 +98,31 @@ async def test_initialize_no_sandbox_when_live():
     ex = BinanceExchange({"sandbox": False, "api_key": "k", "api_secret": "s"})
     with patch("src.exchanges.binance_exchange.ccxt_async") as mock_ccxt:
         mock_client = AsyncMock()
+        mock_client.markets = {}
         mock_ccxt.binance.return_value = mock_client
 
         await ex.initialize()
+        try:
+            mock_client.set_sandbox_mode.assert_not_called()
+        finally:
+            await ex.close()
 
-        mock_client.set_sandbox_mode.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_close_releases_session(exchange):
+    with patch("src.exchanges.binance_exchange.ccxt_async") as mock_ccxt:
+        mock_client = AsyncMock()
+        mock_client.set_sandbox_mode = MagicMock()
+        mock_client.markets = {}
+        mock_ccxt.binance.return_value = mock_client
+
+        await exchange.initialize()
+        session = exchange._session
+        await exchange.close()
+
+    assert session.closed
+    assert exchange._session is None
+    mock_client.close.assert_awaited_once()
 
 
 # -- get_ohlcv --
@@ -147,6 +190,42 @@ async def test_get_ticker_error_returns_zero(exchange):
     assert result == 0.0
 
 
+@pytest.mark.asyncio
+async def test_get_tickers_uses_single_request(exchange):
+    exchange.client = AsyncMock()
+    exchange.client.fetch_tickers = AsyncMock(
+        return_value={
+            "BTC/USDT": {"last": 50000.0, "bid": 49990.0},
+            "ETH/USDT": {"last": 3000.0, "bid": None},
+        }
+    )
+
+    exchange.client.has = {"fetchTickers": True}
+
+    result = await exchange.get_tickers(["BTC/USDT", "ETH/USDT"])
+
+    exchange.client.fetch_tickers.assert_awaited_once_with(["BTC/USDT", "ETH/USDT"])
+    assert result["BTC/USDT"]["last"] == 50000.0
+    assert result["ETH/USDT"]["bid"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_cached_ticker_unaffected_by_caller_mutation(exchange):
+    exchange.client = AsyncMock()
+    exchange.client.fetch_ticker = AsyncMock(
+        return_value={"last": 50000.0, "bid": 49990.0}
+    )
+
+    first = await exchange.get_ticker("BTC/USDT")
+    first["last"] = 0.0
+    second = await exchange.get_ticker("BTC/USDT")
+    second["bid"] = 0.0
+
+    assert (await exchange.get_ticker("BTC/USDT"))["last"] == 50000.0
+    assert (await exchange.get_ticker("BTC/USDT"))["bid"] == 49990.0
+    exchange.client.fetch_ticker.assert_awaited_once()
+
+
 # -- orders --
 
 
@@ -207,18 +286,18 @@ async def test_get_positions_maps_balances(exchange):
     exchange.client.fetch_balance = AsyncMock(
         return_value={"total": {"BTC": 0.5, "ETH": 2.0, "USDT": 1000.0}}
     )
-    exchange.client.markets = {
-        "BTC/USDT": {"base": "BTC", "quote": "USDT", "spot": True},
-        "ETH/USDT": {"base": "ETH", "quote": "USDT", "spot": True},
-    }
-    exchange.client.fetch_ticker = AsyncMock(
-        side_effect=lambda s: {"last": 50000.0} if "BTC" in s else {"last": 3000.0}
+    exchange._usdt_bases = frozenset({"BTC", "ETH"})
+    exchange.client.has = {"fetchTickers": True}
+    exchange.client.fetch_tickers = AsyncMock(
+        return_value={"BTC/USDT": {"last": 50000.0}, "ETH/USDT": {"last": 3000.0}}
     )
 
     result = await exchange.get_positions()
 
+    exchange.client.fetch_tickers.assert_awaited_once()
     assert "BTC/USDT" in result
     assert result["BTC/USDT"]["quantity"] == 0.5
+    assert result["BTC/USDT"]["entry_price"] == 50000.0
     assert result["BTC/USDT"]["side"] == "long"
     assert "ETH/USDT" in result
     assert result["ETH/USDT"]["quantity"] == 2.0
@@ -232,9 +311,7 @@ async def test_get_positions_skips_zero_balances(exchange):
     exchange.client.fetch_balance = AsyncMock(
         return_value={"total": {"BTC": 0.0, "ETH": 0.0, "USDT": 500.0}}
     )
-    exchange.client.markets = {
-        "BTC/USDT": {"base": "BTC", "quote": "USDT", "spot": True},
-    }
+    exchange._usdt_bases = frozenset({"BTC"})
 
     result = await exchange.get_positions()
 
@@ -247,6 +324,28 @@ async def test_get_positions_without_auth_raises(exchange_no_keys):
         await exchange_no_keys.get_positions()
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method", ["get_balance", "get_positions"])
+async def test_rejected_api_key_raises(exchange, method):
+    exchange.client = AsyncMock()
+    exchange.client.fetch_balance = AsyncMock(
+        side_effect=ccxt_async.AuthenticationError("Invalid API-key")
+    )
+
+    with pytest.raises(ccxt_async.AuthenticationError):
+        await getattr(exchange, method)()
+
+
+@pytest.mark.asyncio
+async def test_get_balance_network_error_returns_empty(exchange):
+    exchange.client = AsyncMock()
+    exchange.client.fetch_balance = AsyncMock(
+        side_effect=ccxt_async.NetworkError("down")
+    )
+
+    assert await exchange.get_balance() == {}
+
+
 # -- normalize_order --
 
 
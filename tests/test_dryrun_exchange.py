@@ -0,0 +1,248 @@
+"""Tests for the DryRun paper-trading exchange"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.exchanges.dryrun_exchange import DryRunExchange, load_trade_log
+from src.utils import fast_json
+
+
+REPORTS = Path("reports")
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_dir(tmp_path, monkeypatch):
+    """DryRun writes under ./reports, so run every test in a scratch dir"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _market_data(price=100.0):
+    real = MagicMock()
+    real.supports_ohlcv_stream = False
+    real.get_ticker = AsyncMock(return_value={"last": price})
+    real.close = AsyncMock()
+    return real
+
+
+@pytest.fixture
+def exchange():
+    return DryRunExchange(
+        {"initial_capital": 10000.0, "persist_interval": 0},
+        shared_exchange=_market_data(),
+    )
+
+
+# -- trade log --
+
+
+@pytest.mark.asyncio
+async def test_trade_log_archived_on_close(exchange):
+    await exchange.initialize()
+    await exchange.create_market_buy_order("BTC/USDT", 1.0)
+    await exchange.create_market_sell_order("BTC/USDT", 0.5)
+    await exchange.close()
+
+    assert exchange.trade_log_path.exists()
+    assert not list(REPORTS.glob("*.jsonl"))
+    trades = load_trade_log(exchange.trade_log_path)
+    assert [t["side"] for t in trades] == ["buy", "sell"]
+
+
+@pytest.mark.asyncio
+async def test_trade_log_rotates_per_run(monkeypatch):
+    """A second run writes a fresh log instead of appending to the first"""
+    clock = iter([1_700_000_000, 1_700_000_060])
+    real = _market_data()
+    paths = []
+    for _ in range(2):
+        now = next(clock) * 1_000_000_000
+        monkeypatch.setattr(
+            "src.exchanges.dryrun_exchange.time.time_ns", lambda now=now: now
+        )
+        ex = DryRunExchange({"persist_interval": 0}, shared_exchange=real)
+        await ex.initialize()
+        await ex.create_market_buy_order("BTC/USDT", 0.1)
+        await ex.close()
+        paths.append(ex.trade_log_path)
+
+    assert paths[0] != paths[1]
+    assert [len(load_trade_log(p)) for p in paths] == [1, 1]
+
+
+def test_trade_log_readable_after_kill(in_tmp_dir):
+    """A writer killed mid-run leaves a log that still reads back"""
+    script = textwrap.dedent(
+        """
+        import asyncio, sys, time
+        from unittest.mock import AsyncMock, MagicMock
+        from src.exchanges.dryrun_exchange import DryRunExchange
+
+        async def main():
+            real = MagicMock()
+            real.get_ticker = AsyncMock(return_value={"last": 100.0})
+            ex = DryRunExchange(
+                {"trade_log_flush_every": 1}, shared_exchange=real
+            )
+            await ex.initialize()
+            for _ in range(5):
+                await ex.create_market_buy_order("BTC/USDT", 0.1)
+            print(ex.trade_log_path, flush=True)
+            time.sleep(60)
+
+        asyncio.run(main())
+        """
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    proc = subprocess.Popen(
+        [sys.executable, "-c", script],
+        cwd=in_tmp_dir,
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        archive = Path(proc.stdout.readline().strip())
+    finally:
+        proc.kill()
+        proc.wait()
+        proc.stdout.close()
+
+    assert len(load_trade_log(in_tmp_dir / archive)) == 5
+
+
+@pytest.mark.asyncio
+async def test_leftover_log_archived_on_next_run(exchange):
+    """A crashed run's log, torn tail included, is folded into the archive"""
+    REPORTS.mkdir()
+    live = REPORTS / "dryrun_trades_20240101_000000.jsonl"
+    live.write_bytes(b'{"side": "buy"}\n{"side": "sell"}\n{"side": "bu')
+
+    await exchange.initialize()
+    await exchange.create_market_buy_order("BTC/USDT", 1.0)
+    await exchange.close()
+
+    assert not live.exists()
+    crashed = load_trade_log(REPORTS / "dryrun_trades_20240101_000000.jsonl.gz")
+    assert [t["side"] for t in crashed] == ["buy", "sell"]
+    assert len(load_trade_log(exchange.trade_log_path)) == 1
+
+
+@pytest.mark.asyncio
+async def test_trade_log_and_state_without_orjson(exchange, monkeypatch):
+    monkeypatch.setattr(fast_json, "orjson", None)
+
+    await exchange.initialize()
+    await exchange.create_market_buy_order("BTC/USDT", 1.0)
+    await exchange.close()
+
+    assert [t["side"] for t in load_trade_log(exchange.trade_log_path)] == ["buy"]
+    state = json.loads((REPORTS / "dryrun_state.json").read_text())
+    assert state["order_counter"] == 1
+
+
+# -- state persistence --
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_inflight_state_write(exchange):
+    """The final save lands after, not under, a background write"""
+    started = threading.Event()
+    write_state = exchange._write_state
+    writes = []
+
+    def slow_write(state):
+        started.set()
+        time.sleep(0.2)
+        write_state(state)
+        writes.append(state["order_counter"])
+
+    exchange._write_state = slow_write
+    await exchange.initialize()
+    await exchange.create_market_buy_order("BTC/USDT", 0.1)
+    await asyncio.to_thread(started.wait, 5)
+    await exchange.create_market_buy_order("BTC/USDT", 0.1)
+    await exchange.close()
+
+    assert writes[0] == 1 and writes[-1] == 2
+    state = json.loads((REPORTS / "dryrun_state.json").read_text())
+    assert state["order_counter"] == 2
+    assert not list(REPORTS.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_order_burst_coalesces_into_one_state_write(exchange):
+    exchange._persist_delay = 0.05
+    write_state = exchange._write_state
+    writes = []
+
+    def counting_write(state):
+        writes.append(state["order_counter"])
+        write_state(state)
+
+    exchange._write_state = counting_write
+    await exchange.initialize()
+    for _ in range(5):
+        await exchange.create_market_buy_order("BTC/USDT", 0.1)
+    await asyncio.sleep(0.2)
+
+    assert writes == [5]
+    state = json.loads((REPORTS / "dryrun_state.json").read_text())
+    assert state["order_counter"] == 5
+    await exchange.close()
+
+
+@pytest.mark.asyncio
+async def test_live_log_of_running_process_left_alone(exchange):
+    """Another run's log is only archived once its owner has exited"""
+    REPORTS.mkdir()
+    running = REPORTS / "dryrun_trades_20240101_000000_1_aaaaaa.jsonl"
+    running.write_bytes(b'{"side": "buy"}\n')
+    running.with_suffix(".pid").write_text(str(os.getpid()))
+
+    dead = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    exited = REPORTS / "dryrun_trades_20240101_000000_2_bbbbbb.jsonl"
+    exited.write_bytes(b'{"side": "sell"}\n')
+    exited.with_suffix(".pid").write_text(dead.stdout.strip())
+
+    await exchange.initialize()
+    await exchange.close()
+
+    assert running.read_bytes() == b'{"side": "buy"}\n'
+    assert not exited.exists() and not exited.with_suffix(".pid").exists()
+    archived = load_trade_log(exited.with_name(exited.name + ".gz"))
+    assert [t["side"] for t in archived] == ["sell"]
+    assert not exchange._trade_log_file.with_suffix(".pid").exists()
+
+
+@pytest.mark.asyncio
+async def test_runs_started_in_same_second_get_separate_logs(monkeypatch):
+    monkeypatch.setattr(
+        "src.exchanges.dryrun_exchange.time.time_ns", lambda: 1_700_000_000 * 10**9
+    )
+    real = _market_data()
+    first = DryRunExchange({"persist_interval": 0}, shared_exchange=real)
+    second = DryRunExchange({"persist_interval": 0}, shared_exchange=real)
+    await first.initialize()
+    await second.initialize()
+    await first.create_market_buy_order("BTC/USDT", 0.1)
+    await second.close()
+    await first.close()
+
+    assert first.trade_log_path != second.trade_log_path
+    assert len(load_trade_log(first.trade_log_path)) == 1
@@ -0,0 +1,25 @@
+"""Tests for the BaseExchange defaults"""
+
+import pytest
+
+from src.exchanges.exchange_factory import BinanceExchangeStub, _simulated_ohlcv
+
+
+@pytest.mark.asyncio
+async def test_watch_ohlcv_polls_without_stream():
+    exchange = BinanceExchangeStub({"ohlcv_poll_interval": 0})
+
+    candles = await exchange.watch_ohlcv("BTC/USDT", "5m")
+
+    assert not exchange.supports_ohlcv_stream
+    assert len(candles) == 2
+    assert isinstance(candles[-1][0], int)
+
+
+def test_simulated_ohlcv_rows():
+    candles = _simulated_ohlcv(100.0, 5, 0.05, (0.998, 1.002, 0.997), (100, 200))
+
+    assert len(candles) == 5
+    assert all(len(c) == 6 and isinstance(c[0], int) for c in candles)
+    assert [c[0] for c in candles] == sorted(c[0] for c in candles)
+    assert all(c[3] <= c[4] <= c[2] for c in candles)
@@ -0,0 +1,223 @@
+"""Tests for the TradingEngine main loop helpers"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.core.trading_engine import TradingEngine, _write_json
+from src.utils import fast_json
+
+
+MINUTE_MS = 60_000
+
+
+def _candles(start, count):
+    """count one-minute candles starting at candle index start"""
+    return [
+        [(start + i) * MINUTE_MS, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 10.0]
+        for i in range(count)
+    ]
+
+
+def _last_index(frame):
+    """Candle index of a frame's newest row"""
+    return frame["timestamp"].iloc[-1].value // 1_000_000 // MINUTE_MS
+
+
+@pytest.fixture
+def engine():
+    config_manager = MagicMock()
+    config_manager.get_trading_config.return_value = {
+        "timeframe": "5m",
+        "initial_capital": 10000,
+        "pairs": ["BTC/USDT", "ETH/USDT"],
+    }
+    return TradingEngine(config_manager)
+
+
+# -- signal processing --
+
+
+class _MaxOnePosition:
+    """Risk stub that allows a single open position"""
+
+    async def assess_risk(self, signal, positions):
+        if positions:
+            return {"approved": False, "reason": "max positions reached"}
+        return {"approved": True, "position_size": 0.1}
+
+
+@pytest.mark.asyncio
+async def test_signals_assessed_against_positions_from_earlier_fills(
+    engine, monkeypatch
+):
+    """A fill earlier in the loop counts toward the next signal's limits"""
+    engine.risk_manager = _MaxOnePosition()
+    fills = []
+
+    async def fill(self, signal, risk_assessment):
+        fills.append(signal["symbol"])
+        self.positions[signal["symbol"]] = {"quantity": 1.0}
+
+    monkeypatch.setattr(TradingEngine, "_execute_signal", fill)
+
+    await engine._process_signals(
+        [
+            {"symbol": "BTC/USDT", "action": "buy"},
+            {"symbol": "ETH/USDT", "action": "buy"},
+        ]
+    )
+
+    assert fills == ["BTC/USDT"]
+
+
+# -- state persistence --
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_state_file_round_trips_numpy_values(
+    engine, tmp_path, monkeypatch, use_orjson
+):
+    if not use_orjson:
+        monkeypatch.setattr(fast_json, "orjson", None)
+    elif fast_json.orjson is None:
+        pytest.skip("orjson not installed")
+    engine._state_file = tmp_path / "engine_state.json"
+    state = {
+        "positions": {"BTC/USDT": {"quantity": np.float64(0.5)}},
+        "loop_count": np.int64(7),
+    }
+
+    _write_json(state, engine._state_file)
+    engine._load_state()
+
+    assert engine._state_file.read_text().startswith('{\n  "positions"')
+    assert engine.positions == {"BTC/USDT": {"quantity": 0.5}}
+    assert engine._loop_count == 7
+
+
+# -- exchange --
+
+
+@pytest.mark.asyncio
+async def test_dryrun_reconnect_keeps_shared_market_data(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        TradingEngine, "_backoff_delay", staticmethod(lambda attempt: 0.0)
+    )
+    config_manager = MagicMock()
+    config_manager.get_trading_config.return_value = {"initial_capital": 10000}
+    config_manager.get_exchange_config.side_effect = lambda: {
+        "name": "binance_dryrun",
+        "persist_interval": 0,
+    }
+    market_data = MagicMock(supports_ohlcv_stream=False)
+    market_data.close = AsyncMock()
+    engine = TradingEngine(config_manager, market_data=market_data)
+
+    engine.exchange = engine._create_exchange()
+    await engine.exchange.initialize()
+    first = engine.exchange
+    await engine._attempt_reconnection()
+
+    assert engine.exchange is not first
+    assert engine.exchange._real_exchange is market_data
+    await engine.exchange.close()
+    market_data.close.assert_not_awaited()
+
+
+# -- kline cache --
+
+
+def test_merge_klines_extends_overlapping_window(engine):
+    engine._klines["BTC/USDT"] = engine._ohlcv_to_frame(_candles(0, 100))
+
+    merged = engine._merge_klines("BTC/USDT", engine._ohlcv_to_frame(_candles(99, 2)))
+
+    frame = engine._klines["BTC/USDT"]
+    assert merged
+    assert len(frame) == 100
+    assert frame["timestamp"].is_monotonic_increasing
+    assert _last_index(frame) == 100
+
+
+def test_merge_klines_rejects_gap(engine):
+    cached = engine._ohlcv_to_frame(_candles(0, 100))
+    engine._klines["BTC/USDT"] = cached
+
+    assert not engine._merge_klines(
+        "BTC/USDT", engine._ohlcv_to_frame(_candles(150, 2))
+    )
+    assert engine._klines["BTC/USDT"] is cached
+
+
+@pytest.mark.asyncio
+async def test_market_data_refills_window_after_gap(engine):
+    engine._pairs = ("BTC/USDT",)
+    engine._klines["BTC/USDT"] = engine._ohlcv_to_frame(_candles(0, 100))
+    engine.exchange = MagicMock()
+    engine.exchange.get_ohlcv = AsyncMock(
+        side_effect=[_candles(150, 2), _candles(52, 100)]
+    )
+
+    data = await engine._get_market_data()
+
+    assert engine.exchange.get_ohlcv.await_args_list[-1].kwargs == {"limit": 100}
+    assert _last_index(data["BTC/USDT"]) == 151
+
+
+# -- kline streams --
+
+
+class _StreamingExchange:
+    supports_ohlcv_stream = True
+
+    def __init__(self):
+        self.watched = asyncio.Event()
+        self.close = AsyncMock()
+
+    async def watch_ohlcv(self, symbol, timeframe):
+        self.watched.set()
+        await asyncio.sleep(0.01)
+        return _candles(0, 3)
+
+
+@pytest.mark.asyncio
+async def test_streams_start_and_stop_with_engine(engine, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    async def idle_loop(self):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(TradingEngine, "_trading_loop", idle_loop)
+    engine._pairs = ("BTC/USDT",)
+    engine.exchange = _StreamingExchange()
+
+    await engine.start()
+    assert len(engine._stream_tasks) == 1
+    await asyncio.wait_for(engine.exchange.watched.wait(), 1)
+    await asyncio.sleep(0.05)
+    tasks = list(engine._stream_tasks)
+
+    await engine.stop()
+
+    assert len(engine._stream_candles["BTC/USDT"]) == 3
+    assert engine._stream_tasks == []
+    assert all(task.done() for task in tasks)
+    engine.exchange.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_no_streams_without_stream_support(engine, monkeypatch):
+    async def idle_loop(self):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(TradingEngine, "_trading_loop", idle_loop)
+    engine.exchange = MagicMock(supports_ohlcv_stream=False)
+
+    await engine.start()
+    assert engine._stream_tasks == []
+    engine._trading_task.cancel()
+    await asyncio.gather(engine._trading_task, return_exceptions=True)
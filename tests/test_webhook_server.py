@@ -0,0 +1,43 @@
+"""Tests for the TradingView webhook server"""
+
+import pytest
+
+aiohttp_test = pytest.importorskip("aiohttp.test_utils")
+
+from src.core.config_manager import ConfigManager
+from start_webhook_server import create_app
+
+
+@pytest.mark.asyncio
+async def test_queued_webhook_executes_before_shutdown():
+    app = await create_app(ConfigManager())
+    exchange = app["exchange"]
+    client = aiohttp_test.TestClient(aiohttp_test.TestServer(app))
+    await client.start_server()
+    try:
+        resp = await client.post(
+            "/webhook/tradingview",
+            data=b'{"action": "buy", "symbol": "BTC/USDT", "amount": 0.01}',
+        )
+        assert resp.status == 202
+        assert (await resp.json()) == {"status": "queued"}
+    finally:
+        # Shutdown drains the queue before the workers are cancelled
+        await client.close()
+
+    assert [o["side"] for o in exchange.orders] == ["buy"]
+    assert app["webhook_handler"]._workers == []
+
+
+@pytest.mark.asyncio
+async def test_invalid_webhook_rejected():
+    app = await create_app(ConfigManager())
+    client = aiohttp_test.TestClient(aiohttp_test.TestServer(app))
+    await client.start_server()
+    try:
+        resp = await client.post("/webhook/tradingview", data=b"not json")
+        assert resp.status == 400
+    finally:
+        await client.close()
+
+    assert not app["exchange"].orders